@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from django.template.base import Template
+        from . import metrics
+
+        if not getattr(Template.render, 'timed', False):
+            Template.render = metrics.timed_render(Template.render)
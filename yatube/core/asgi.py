@@ -0,0 +1,163 @@
+import asyncio
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+STREAM_BUFFER: int = 8
+"""Сколько частей ответа поток пула опережает отправку клиенту."""
+
+
+class WsgiToAsgi:
+    """
+    ASGI-приложение поверх WSGI-приложения Django.
+
+    Соединения, чтение тела запроса и отправка ответа обслуживает цикл
+    событий, а сам вид с его запросами к БД и кешу выполняется в пуле
+    из ``max_workers`` потоков. Медленный клиент не занимает поток, а
+    лишние запросы ждут в очереди пула, а не плодят потоки.
+
+    Тело ответа уходит частями (``more_body``) по мере того, как его
+    отдает WSGI-приложение, поэтому ``StreamingHttpResponse`` не
+    собирается в памяти. Такой ответ держит поток пула, пока клиент
+    не примет все части: генератор нельзя продолжать в другом потоке,
+    у которого свое соединение с БД.
+    """
+
+    def __init__(self, wsgi_application, max_workers: int):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(max_workers,
+                                           thread_name_prefix='asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f"Неподдерживаемый тип {scope['type']}")
+        body = await self.read_body(receive)
+        environ = self.environ(scope, body)
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(STREAM_BUFFER)
+        stop = threading.Event()
+
+        def put(message):
+            asyncio.run_coroutine_threadsafe(queue.put(message),
+                                             loop).result()
+
+        done = loop.run_in_executor(self.executor, self.run_wsgi,
+                                    environ, put, stop)
+        try:
+            while True:
+                message = await queue.get()
+                if message is None:
+                    break
+                await send(message)
+        except BaseException:
+            # Клиент ушел: поток пула дописывает в очередь до конца
+            # текущей части, закрывает ответ и выходит.
+            stop.set()
+            while await queue.get() is not None:
+                pass
+            raise
+        finally:
+            await done
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        return b''.join(chunks)
+
+    @staticmethod
+    def environ(scope, body: bytes) -> dict:
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode().decode(
+                'latin-1'),
+            'PATH_INFO': scope['path'].encode().decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1] or 80),
+            'REMOTE_ADDR': client[0],
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = f'HTTP_{name}'
+            value = value.decode('latin-1')
+            if name in environ:
+                # Несколько Cookie (HTTP/2) склеиваются как одна строка
+                # cookie, остальные повторы — через запятую (RFC 7230).
+                separator = '; ' if name == 'HTTP_COOKIE' else ','
+                value = f'{environ[name]}{separator}{value}'
+            environ[name] = value
+        return environ
+
+    def run_wsgi(self, environ: dict, put, stop: threading.Event):
+        """
+        Весь цикл WSGI, включая ``close()``, — в потоке пула; сообщения
+        ASGI передаются циклу событий через ``put``. Каждый заголовок
+        ответа, в том числе повторный ``Set-Cookie``, — отдельная пара.
+        """
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+
+        try:
+            result = self.wsgi_application(environ, start_response)
+            try:
+                self._send_result(result, started, put, stop)
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        finally:
+            put(None)
+
+    @staticmethod
+    def _send_result(result, started: dict, put, stop: threading.Event):
+        """Части тела по одной; последняя — с ``more_body=False``."""
+        chunks = (chunk for chunk in result if chunk)
+        previous = next(chunks, b'')
+        put({
+            'type': 'http.response.start',
+            'status': started['status'],
+            'headers': started['headers'],
+        })
+        for chunk in chunks:
+            if stop.is_set():
+                return
+            put({'type': 'http.response.body', 'body': previous,
+                 'more_body': True})
+            previous = chunk
+        put({'type': 'http.response.body', 'body': previous})
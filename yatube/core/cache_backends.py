@@ -0,0 +1,409 @@
+import logging
+import pickle
+import re
+import socket
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+INTEGER_RE = re.compile(rb'-?\d+')
+
+INCR_SCRIPT = (
+    "if redis.call('EXISTS', KEYS[1]) == 1 then "
+    "return redis.call('INCRBY', KEYS[1], ARGV[1]) end"
+)
+"""INCRBY только существующего ключа; скрипт выполняется атомарно."""
+
+
+class RespError(Exception):
+    """Ответ сервера с ошибкой (``-ERR ...``)."""
+
+
+class RespConnection:
+    """Соединение с сервером по протоколу Redis (RESP2)."""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout)
+        self.file = self.sock.makefile('rb')
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    @staticmethod
+    def encode(*args) -> bytes:
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def read(self):
+        line = self.file.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError('Соединение с кешем закрыто')
+        kind, body = line[:1], line[1:-2]
+        if kind == b'+':
+            return body.decode()
+        if kind == b'-':
+            raise RespError(body.decode())
+        if kind == b':':
+            return int(body)
+        if kind == b'$':
+            length = int(body)
+            if length < 0:
+                return None
+            data = self.file.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            length = int(body)
+            if length < 0:
+                return None
+            return [self.read() for _ in range(length)]
+        raise ConnectionError(f'Непонятный ответ кеша: {line!r}')
+
+    def execute(self, *commands: tuple) -> list:
+        """Отправляет команды одним пакетом и читает все ответы."""
+        self.sock.sendall(b''.join(self.encode(*args) for args in commands))
+        replies, error = [], None
+        for _ in commands:
+            try:
+                replies.append(self.read())
+            except RespError as exc:
+                replies.append(None)
+                error = error or exc
+        if error:
+            raise error
+        return replies
+
+
+class RespCache(BaseCache):
+    """
+    Кеш на сервере, совместимом с Redis.
+
+    LOCATION — ``host:port``; OPTIONS: ``DB``, ``PASSWORD``,
+    ``SOCKET_TIMEOUT``. Целые числа хранятся как есть (для INCRBY),
+    остальное — через pickle.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        host, _, port = location.rpartition(':')
+        self._address = (host or 'localhost', int(port or 6379))
+        options = params.get('OPTIONS', {})
+        self._db = options.get('DB', 0)
+        self._password = options.get('PASSWORD')
+        self._socket_timeout = options.get('SOCKET_TIMEOUT', 1.0)
+        self._local = threading.local()
+
+    def _connect(self) -> RespConnection:
+        connection = RespConnection(*self._address, self._socket_timeout)
+        setup = []
+        if self._password:
+            setup.append(('AUTH', self._password))
+        if self._db:
+            setup.append(('SELECT', self._db))
+        if setup:
+            connection.execute(*setup)
+        return connection
+
+    def _execute(self, *commands: tuple) -> list:
+        for attempt in range(2):
+            connection = getattr(self._local, 'connection', None)
+            try:
+                if connection is None:
+                    connection = self._local.connection = self._connect()
+                return connection.execute(*commands)
+            except OSError:
+                self._local.connection = None
+                if connection is not None:
+                    connection.close()
+                if attempt:
+                    raise
+
+    def _command(self, *args):
+        return self._execute(args)[0]
+
+    def _key(self, key, version=None) -> str:
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _ttl(self, timeout):
+        """Время жизни в миллисекундах; None — бессрочно."""
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return None
+        return max(int(timeout * 1000), 0)
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value).encode()
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(raw: bytes):
+        if INTEGER_RE.fullmatch(raw):
+            return int(raw)
+        return pickle.loads(raw)
+
+    def _set_command(self, key, value, ttl, *flags) -> tuple:
+        command = ('SET', key, self._encode(value), *flags)
+        if ttl is not None:
+            command += ('PX', ttl)
+        return command
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key, ttl = self._key(key, version), self._ttl(timeout)
+        if ttl == 0:
+            return not self._command('EXISTS', key)
+        return self._command(*self._set_command(key, value, ttl, 'NX')) \
+            == 'OK'
+
+    def get(self, key, default=None, version=None):
+        raw = self._command('GET', self._key(key, version))
+        return default if raw is None else self._decode(raw)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key, ttl = self._key(key, version), self._ttl(timeout)
+        if ttl == 0:
+            self._command('DEL', key)
+        else:
+            self._command(*self._set_command(key, value, ttl))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key, ttl = self._key(key, version), self._ttl(timeout)
+        if ttl is None:
+            return bool(self._command('EXISTS', key)
+                        and self._command('PERSIST', key) is not None)
+        return bool(self._command('PEXPIRE', key, max(ttl, 1)))
+
+    def delete(self, key, version=None):
+        self._command('DEL', self._key(key, version))
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        made = [self._key(key, version) for key in keys]
+        values = self._command('MGET', *made)
+        return {
+            key: self._decode(raw)
+            for key, raw in zip(keys, values) if raw is not None
+        }
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        ttl = self._ttl(timeout)
+        if ttl == 0:
+            self.delete_many(data, version)
+        elif data:
+            self._execute(*(
+                self._set_command(self._key(key, version), value, ttl)
+                for key, value in data.items()
+            ))
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self._command('DEL', *keys)
+
+    def has_key(self, key, version=None):
+        return bool(self._command('EXISTS', self._key(key, version)))
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        try:
+            value = self._command('EVAL', INCR_SCRIPT, 1, key, delta)
+        except RespError as exc:
+            raise ValueError(str(exc))
+        if value is None:
+            raise ValueError(f"Key '{key}' not found")
+        return value
+
+    def clear(self):
+        self._command('FLUSHDB')
+
+
+class TieredCache(BaseCache):
+    """
+    Локальный LRU процесса перед общим кешем.
+
+    LOCATION — псевдоним общего кеша в CACHES. Локально хранятся
+    только ключи с префиксами из OPTIONS['LOCAL_PREFIXES']: их значения
+    не меняются (версия — часть ключа), поэтому расхождение между
+    процессами невозможно. Счетчики версий и прочее читаются только
+    из общего кеша.
+
+    Если общий кеш недоступен, запросы к нему на ``RETRY_AFTER``
+    секунд заменяются промахами, а локальный уровень продолжает
+    работать. Неудавшиеся ``incr`` (сдвиги версий) запоминаются и
+    повторяются, как только общий кеш ответит: иначе после сбоя
+    читались бы страницы под старой версией.
+    """
+
+    SHARED_ERRORS = (OSError, DatabaseError)
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._alias = location or 'shared'
+        self._prefixes = tuple(options.get('LOCAL_PREFIXES', ()))
+        self._local_timeout = options.get('LOCAL_TIMEOUT', 60)
+        self._retry_after = options.get('RETRY_AFTER', 5)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self._failed_incrs = Counter()
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches[self._alias]
+
+    def _shared(self, method: str, *args, default=None, **kwargs):
+        if time.monotonic() < self._down_until:
+            return default
+        try:
+            if self._failed_incrs:
+                self._replay()
+            return getattr(self.shared, method)(*args, **kwargs)
+        except self.SHARED_ERRORS as exc:
+            logger.warning('Общий кеш недоступен: %s', exc)
+            self._down_until = time.monotonic() + self._retry_after
+            return default
+
+    def _replay(self):
+        """Повторяет ``incr``, не дошедшие до общего кеша."""
+        with self._lock:
+            pending, self._failed_incrs = self._failed_incrs, Counter()
+        while pending:
+            (key, version), delta = pending.popitem()
+            try:
+                self.shared.incr(key, delta, version=version)
+            except ValueError:
+                continue
+            except self.SHARED_ERRORS:
+                pending[key, version] += delta
+                with self._lock:
+                    self._failed_incrs.update(pending)
+                raise
+
+    def _is_local(self, key) -> bool:
+        return bool(self._prefixes) and key.startswith(self._prefixes)
+
+    def _local_get(self, key, version):
+        key = self.make_key(key, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _local_set(self, key, value, timeout, version):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        lifetime = self._local_timeout
+        if timeout is not None:
+            lifetime = min(lifetime, timeout)
+        key = self.make_key(key, version)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + lifetime, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _local_delete(self, key, version):
+        with self._lock:
+            self._entries.pop(self.make_key(key, version), None)
+
+    def get(self, key, default=None, version=None):
+        if self._is_local(key):
+            entry = self._local_get(key, version)
+            if entry is not None:
+                return entry[1]
+        value = self._shared('get', key, version=version)
+        if value is None:
+            return default
+        if self._is_local(key):
+            self._local_set(key, value, self._local_timeout, version)
+        return value
+
+    def get_many(self, keys, version=None):
+        found, rest = {}, []
+        for key in keys:
+            entry = self._is_local(key) and self._local_get(key, version)
+            if entry:
+                found[key] = entry[1]
+            else:
+                rest.append(key)
+        if rest:
+            shared = self._shared('get_many', rest, version=version,
+                                  default={})
+            for key, value in shared.items():
+                if self._is_local(key):
+                    self._local_set(key, value, self._local_timeout,
+                                    version)
+            found.update(shared)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if self._is_local(key):
+            self._local_set(key, value, timeout, version)
+        self._shared('set', key, value, timeout, version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        for key, value in data.items():
+            if self._is_local(key):
+                self._local_set(key, value, timeout, version)
+        return self._shared('set_many', data, timeout, version=version,
+                            default=[])
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._local_delete(key, version)
+        return self._shared('add', key, value, timeout, version=version,
+                            default=False)
+
+    def delete(self, key, version=None):
+        self._local_delete(key, version)
+        self._shared('delete', key, version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            self._local_delete(key, version)
+        self._shared('delete_many', keys, version=version)
+
+    def has_key(self, key, version=None):
+        if self._is_local(key) and self._local_get(key, version):
+            return True
+        return self._shared('has_key', key, version=version, default=False)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._shared('touch', key, timeout, version=version,
+                            default=False)
+
+    def incr(self, key, delta=1, version=None):
+        value = self._shared('incr', key, delta, version=version)
+        if value is None:
+            with self._lock:
+                self._failed_incrs[key, version] += delta
+            raise ValueError(f"Key '{key}' not found")
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self._shared('clear')
@@ -0,0 +1,152 @@
+import math
+import random
+import time
+from typing import Any, Callable, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from . import metrics
+
+LEASE_TIMEOUT: int = 10
+"""Сколько секунд держится право пересчитать значение."""
+LEASE_WAIT: float = 2.0
+"""Сколько секунд ждать чужого пересчета, если старого значения нет."""
+LEASE_POLL: float = 0.02
+"""Пауза между проверками, готово ли значение."""
+EARLY_BETA: float = 1.0
+"""Склонность к раннему пересчету (XFetch): больше — раньше."""
+
+
+def make_key(namespace: str, *parts) -> str:
+    """
+    Ключ ``namespace:part:part``.
+
+    Пространства, в которых значение под ключом не меняется, стоит
+    перечислить в ``LOCAL_PREFIXES`` настроек кеша: тогда они читаются
+    и из памяти процесса.
+    """
+    return ':'.join([namespace, *map(str, parts)])
+
+
+def get(namespace: str, *parts) -> Optional[Any]:
+    value = cache.get(make_key(namespace, *parts))
+    if value is None:
+        metrics.cache_miss()
+    else:
+        metrics.cache_hit()
+    return value
+
+
+def set(namespace: str, *parts, value, timeout: Optional[int]):
+    cache.set(make_key(namespace, *parts), value, timeout)
+
+
+def get_many(namespace: str, parts: Iterable[tuple]) -> dict:
+    """Значения по кортежам частей ключа; отсутствующих нет в ответе."""
+    keys = {make_key(namespace, *item): item for item in parts}
+    found = cache.get_many(list(keys))
+    metrics.cache_hit(len(found))
+    metrics.cache_miss(len(keys) - len(found))
+    return {keys[key]: value for key, value in found.items()}
+
+
+def set_many(namespace: str, values: dict, timeout: Optional[int]):
+    cache.set_many(
+        {make_key(namespace, *item): value for item, value in values.items()},
+        timeout,
+    )
+
+
+def _new_version() -> int:
+    # После вытеснения счетчика версия не должна повториться.
+    return time.time_ns() // 1000
+
+
+def version(namespace: str, *parts) -> int:
+    """Текущая версия набора ключей (создается при первом чтении)."""
+    key = make_key(namespace, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = _new_version()
+        cache.add(key, value, None)
+        value = cache.get(key, value)
+    return value
+
+
+def bump(namespace: str, *parts):
+    """Сдвигает версию: все ключи со старой версией больше не читаются."""
+    key = make_key(namespace, *parts)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def _fresh(envelope: dict) -> bool:
+    """
+    Вероятностное раннее истечение (XFetch).
+
+    Чем дольше пересчет (``delta``) и ближе срок, тем вероятнее, что
+    текущий запрос сочтет значение устаревшим и пересчитает его заранее.
+    """
+    jitter = envelope['delta'] * EARLY_BETA * -math.log(
+        1 - random.random()
+    )
+    return time.time() + jitter < envelope['expires']
+
+
+def _compute(key: str, compute: Callable, timeout: int,
+             cacheable: Optional[Callable[[], bool]]):
+    start = time.perf_counter()
+    value = compute()
+    delta = time.perf_counter() - start
+    if cacheable is not None and not cacheable():
+        return value
+    cache.set(key, {
+        'value': value,
+        'expires': time.time() + timeout,
+        'delta': delta,
+    }, timeout + settings.CACHE_STALE_TTL)
+    return value
+
+
+def _wait(key: str, lease: str) -> Optional[dict]:
+    deadline = time.monotonic() + LEASE_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LEASE_POLL)
+        envelope = cache.get(key)
+        if envelope is not None or cache.get(lease) is None:
+            return envelope
+    return None
+
+
+def get_or_compute(namespace: str, *parts, compute: Callable,
+                   timeout: int,
+                   cacheable: Optional[Callable[[], bool]] = None):
+    """
+    Значение из кеша с защитой от одновременного пересчета.
+
+    Пересчитывает только запрос, взявший аренду (``cache.add``);
+    остальные в это время получают прежнее значение, а если его нет —
+    ждут результата. Через ``timeout`` значение считается устаревшим,
+    но еще ``CACHE_STALE_TTL`` секунд отдается, пока идет пересчет.
+    Если ``cacheable`` после пересчета вернет ложь, значение отдается,
+    но не сохраняется.
+    """
+    key = make_key(namespace, *parts)
+    envelope = cache.get(key)
+    if envelope is not None and _fresh(envelope):
+        metrics.cache_hit()
+        return envelope['value']
+    lease = make_key('lease', namespace, *parts)
+    if not cache.add(lease, 1, LEASE_TIMEOUT):
+        if envelope is None:
+            envelope = _wait(key, lease)
+        if envelope is not None:
+            metrics.cache_hit()
+            return envelope['value']
+    metrics.cache_miss()
+    try:
+        return _compute(key, compute, timeout, cacheable)
+    finally:
+        cache.delete(lease)
@@ -0,0 +1,104 @@
+import random
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_state = threading.local()
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _replicas() -> list[str]:
+    return settings.DATABASE_REPLICAS
+
+
+class ReplicaRouter:
+    """
+    Чтение моделей из REPLICA_APPS идет на случайную реплику, запись — на
+    основную базу.
+
+    Реплики используются только внутри запроса, обработанного
+    ``ReplicaMiddleware``: команды и фоновые задачи читают то, что
+    только что записали сами. Запрос, который уже писал, и запросы
+    пользователя сразу после записи читают основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (not getattr(_state, 'routing', False)
+                or getattr(_state, 'primary', False)
+                or model._meta.app_label not in settings.REPLICA_APPS
+                or not _replicas()):
+            return None
+        _state.replica = True
+        return random.choice(_replicas())
+
+    def db_for_write(self, model, **hints):
+        if getattr(_state, 'routing', False):
+            _state.primary = _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+def read_replica() -> bool:
+    """Текущий запрос уже читал реплику."""
+    return getattr(_state, 'replica', False)
+
+
+def use_primary(view):
+    """Вид пишет в базу: все его чтения идут на основную базу."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        previous = getattr(_state, 'primary', False)
+        _state.primary = True
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _state.primary = previous
+    return wrapper
+
+
+class ReplicaMiddleware:
+    """
+    Read-your-writes: после записи пользователь REPLICA_PIN_SECONDS
+    секунд читает основную базу (метка — в cookie). Небезопасные методы
+    всегда работают с основной базой.
+    """
+
+    COOKIE = 'primary_until'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.routing = True
+        _state.wrote = _state.replica = False
+        _state.primary = (
+            request.method not in SAFE_METHODS or self.pinned(request)
+        )
+        try:
+            response = self.get_response(request)
+            if _state.wrote:
+                response.set_cookie(
+                    self.COOKIE,
+                    str(time.time() + settings.REPLICA_PIN_SECONDS),
+                    max_age=settings.REPLICA_PIN_SECONDS,
+                    httponly=True,
+                )
+            return response
+        finally:
+            _state.routing = _state.primary = _state.wrote = False
+            _state.replica = False
+
+    def pinned(self, request) -> bool:
+        try:
+            return float(request.COOKIES.get(self.COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
@@ -0,0 +1,171 @@
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Optional
+
+SLOW_QUERIES: int = 5
+"""Сколько самых медленных запросов хранить для каждого вида."""
+LATENCY_WINDOW: int = 1000
+"""Сколько последних замеров задержки держать для перцентилей."""
+
+_local = threading.local()
+_lock = threading.Lock()
+_views = {}
+
+NUMBER_RE = re.compile(r'\b\d+(\.\d+)?\b')
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+IN_LIST_RE = re.compile(r'\(\s*\?(\s*,\s*\?)*\s*\)')
+
+
+def normalize_sql(sql: str) -> str:
+    """SQL без значений: одинаковые запросы с разными id сливаются."""
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    return IN_LIST_RE.sub('(...)', sql)
+
+
+class RequestStats:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.template_queries = []
+        self.sql = defaultdict(float)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            sql = normalize_sql(sql)
+            self.queries += 1
+            self.db_time += elapsed
+            self.sql[sql] += elapsed
+            if self.template_depth:
+                self.template_queries.append(sql)
+
+
+def current() -> Optional[RequestStats]:
+    return getattr(_local, 'stats', None)
+
+
+def start() -> RequestStats:
+    _local.stats = RequestStats()
+    return _local.stats
+
+
+def stop():
+    _local.stats = None
+
+
+def cache_hit(count: int = 1):
+    stats = current()
+    if stats is not None:
+        stats.cache_hits += count
+
+
+def cache_miss(count: int = 1):
+    stats = current()
+    if stats is not None:
+        stats.cache_misses += count
+
+
+def timed_render(render):
+    """Обертка Template.render: время только внешнего шаблона."""
+    def wrapper(template, *args, **kwargs):
+        stats = current()
+        if stats is None:
+            return render(template, *args, **kwargs)
+        stats.template_depth += 1
+        start_time = time.perf_counter()
+        try:
+            return render(template, *args, **kwargs)
+        finally:
+            stats.template_depth -= 1
+            if not stats.template_depth:
+                stats.template_time += time.perf_counter() - start_time
+    wrapper.timed = True
+    return wrapper
+
+
+class ViewStats:
+    """Накопленные замеры одного вида."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0.0
+        self.template_queries = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.sql = defaultdict(float)
+
+    def add(self, stats: RequestStats, latency: float, status: int):
+        self.requests += 1
+        self.errors += status >= 500
+        self.queries += stats.queries
+        self.db_time += stats.db_time
+        self.cache_hits += stats.cache_hits
+        self.cache_misses += stats.cache_misses
+        self.template_time += stats.template_time
+        self.template_queries += len(stats.template_queries)
+        self.latencies.append(latency)
+        for sql, elapsed in stats.sql.items():
+            self.sql[sql] += elapsed
+        if len(self.sql) > SLOW_QUERIES * 10:
+            slowest = sorted(self.sql.items(), key=lambda item: -item[1])
+            self.sql = defaultdict(float, slowest[:SLOW_QUERIES])
+
+    def as_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(share):
+            return round(latencies[int(share * (len(latencies) - 1))] * 1000,
+                         3)
+
+        slowest = sorted(self.sql.items(), key=lambda item: -item[1])
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'p50_ms': percentile(0.5),
+            'p90_ms': percentile(0.9),
+            'p99_ms': percentile(0.99),
+            'queries_avg': round(self.queries / self.requests, 2),
+            'db_ms_avg': round(self.db_time * 1000 / self.requests, 3),
+            'template_ms_avg': round(
+                self.template_time * 1000 / self.requests, 3
+            ),
+            'template_queries': self.template_queries,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'slowest_sql': [
+                {'sql': sql, 'total_ms': round(elapsed * 1000, 3)}
+                for sql, elapsed in slowest[:SLOW_QUERIES]
+            ],
+        }
+
+
+def record(view: str, stats: RequestStats, latency: float, status: int):
+    with _lock:
+        _views.setdefault(view, ViewStats()).add(stats, latency, status)
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {view: stats.as_dict() for view, stats in _views.items()}
+
+
+def reset():
+    with _lock:
+        _views.clear()
@@ -0,0 +1,68 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from . import metrics
+
+logger = logging.getLogger('yatube.metrics')
+
+
+class MetricsMiddleware:
+    """
+    Замеры выборки запросов: число запросов к БД и время в них,
+    попадания в кеш, время шаблонов и самые медленные SQL.
+    Запросы, выполненные во время отрисовки шаблона (ленивые
+    загрузки связей), сохраняются в ``request.metrics``.
+
+    Итоги копятся в памяти процесса (см. ``core.views.metrics_view``)
+    и пишутся одной JSON-строкой в лог ``yatube.metrics``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.sampled():
+            return self.get_response(request)
+        stats = request.metrics = metrics.start()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(stats)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.stop()
+        latency = time.perf_counter() - start
+        self.report(request, response, stats, latency)
+        return response
+
+    @staticmethod
+    def sampled() -> bool:
+        rate = settings.METRICS_SAMPLE_RATE
+        return rate >= 1 or random.random() < rate
+
+    @staticmethod
+    def report(request, response, stats, latency):
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        metrics.record(view, stats, latency, response.status_code)
+        logger.info(json.dumps({
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'ms': round(latency * 1000, 3),
+            'queries': stats.queries,
+            'db_ms': round(stats.db_time * 1000, 3),
+            'template_ms': round(stats.template_time * 1000, 3),
+            'template_queries': len(stats.template_queries),
+            'cache_hits': stats.cache_hits,
+            'cache_misses': stats.cache_misses,
+        }, ensure_ascii=False))
@@ -1,4 +1,7 @@
+from django.core.exceptions import PermissionDenied
+from django.http import JsonResponse
 from django.shortcuts import render
+from . import metrics
 
 
 def page_not_found(request, exception):
@@ -15,3 +18,14 @@ def internal_server_error(request):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html', status=403)
+
+
+def metrics_view(request):
+    """
+    Метрики процесса в JSON: только для персонала. По адресу не
+    пускаем: за прокси все запросы приходят с 127.0.0.1.
+    """
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return JsonResponse(metrics.snapshot(),
+                        json_dumps_params={'ensure_ascii': False})
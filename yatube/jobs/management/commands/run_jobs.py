@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from jobs.queue import Worker
+
+
+class Command(BaseCommand):
+    help = ('Исполнитель очереди задач: выполняет отложенную работу '
+            'из таблицы jobs_job.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int,
+                            default=settings.JOBS_CONCURRENCY)
+        parser.add_argument('--executor', choices=['thread', 'process'],
+                            default='thread')
+        parser.add_argument('--poll', type=float,
+                            default=settings.JOBS_POLL_INTERVAL)
+        parser.add_argument('--once', action='store_true',
+                            help='выполнить готовые задачи и выйти')
+
+    def handle(self, *args, **options):
+        worker = Worker(options['concurrency'], options['executor'],
+                        options['poll'])
+        try:
+            totals = worker.run(once=options['once'])
+        except KeyboardInterrupt:
+            return
+        for status, count in totals.items():
+            self.stdout.write(f'{status}: {count}')
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=255, verbose_name='Задача')),
+                ('arguments', models.TextField(default='{}', verbose_name='Аргументы (JSON)')),
+                ('priority', models.SmallIntegerField(default=0, verbose_name='Приоритет')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает'), ('running', 'Выполняется'), ('failed', 'Не удалась')], default='pending', max_length=16, verbose_name='Состояние')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='Наибольшее число попыток')),
+                ('run_at', models.DateTimeField(verbose_name='Выполнить не раньше')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Взята')),
+                ('locked_by', models.CharField(blank=True, max_length=255, verbose_name='Исполнитель')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создана')),
+            ],
+            options={
+                'ordering': ['-priority', 'run_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', '-priority', 'run_at'], name='job_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import models
+
+
+class Job(models.Model):
+    """Отложенный вызов задачи (см. ``jobs.queue.task``)."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    DONE = 'done'
+    """Итог удачной задачи; ее строка удаляется, а не хранится."""
+    STATUSES = [
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Не удалась'),
+    ]
+
+    task = models.CharField('Задача', max_length=255)
+    arguments = models.TextField('Аргументы (JSON)', default='{}')
+    priority = models.SmallIntegerField('Приоритет', default=0)
+    status = models.CharField(
+        'Состояние',
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Наибольшее число попыток',
+        default=3,
+    )
+    run_at = models.DateTimeField('Выполнить не раньше')
+    locked_at = models.DateTimeField('Взята', null=True, blank=True)
+    locked_by = models.CharField('Исполнитель', max_length=255, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+
+    class Meta:
+        ordering = ['-priority', 'run_at', 'id']
+        indexes = [
+            models.Index(
+                fields=['status', '-priority', 'run_at'],
+                name='job_queue_idx'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.task} #{self.pk} ({self.status})'
@@ -0,0 +1,206 @@
+import json
+import logging
+import os
+import socket
+import time
+import traceback
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from datetime import timedelta
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def task(priority: int = 0, max_attempts: int = 3):
+    """
+    Делает функцию задачей очереди.
+
+    ``func.delay(*args, **kwargs)`` записывает вызов в таблицу ``Job``
+    в текущей транзакции: задача появится у исполнителя, только если
+    запрос закоммитится; с ``JOBS_EAGER`` она тогда же выполняется в
+    этом процессе. Аргументы должны сериализоваться в JSON.
+    Чем больше ``priority``, тем раньше задача берется в работу.
+    """
+    def decorator(func: Callable) -> Callable:
+        func.task_name = f'{func.__module__}.{func.__qualname__}'
+        func.priority = priority
+        func.max_attempts = max_attempts
+        func.delay = lambda *args, **kwargs: enqueue(func, args, kwargs)
+        return func
+    return decorator
+
+
+def enqueue(func: Callable, args=(), kwargs=None,
+            priority: Optional[int] = None, countdown: float = 0) -> Job:
+    job = Job.objects.create(
+        task=func.task_name,
+        arguments=json.dumps({'args': list(args), 'kwargs': kwargs or {}}),
+        priority=func.priority if priority is None else priority,
+        max_attempts=func.max_attempts,
+        run_at=timezone.now() + timedelta(seconds=countdown),
+    )
+    if settings.JOBS_EAGER:
+        transaction.on_commit(lambda: _run_eager(job.id))
+    return job
+
+
+def _run_eager(job_id: int):
+    """Задача без исполнителя — сразу после коммита, как у настоящего."""
+    if claim_one(job_id, 'eager'):
+        run(job_id)
+
+
+def claim_one(job_id: int, worker: str) -> bool:
+    """Берет задачу, если ее еще не взял другой исполнитель."""
+    return bool(Job.objects.filter(id=job_id, status=Job.PENDING).update(
+        status=Job.RUNNING,
+        locked_at=timezone.now(),
+        locked_by=worker,
+        attempts=F('attempts') + 1,
+    ))
+
+
+def claim(worker: str, limit: int) -> list[int]:
+    """
+    До ``limit`` готовых задач по приоритету.
+
+    Без SELECT ... FOR UPDATE: задачу получает тот, чей UPDATE с
+    условием на состояние изменил строку, поэтому исполнителей может
+    быть несколько на любой базе.
+    """
+    candidates = Job.objects.filter(
+        status=Job.PENDING, run_at__lte=timezone.now()
+    ).values_list('id', flat=True)[:limit * 2]
+    claimed = []
+    for job_id in candidates:
+        if claim_one(job_id, worker):
+            claimed.append(job_id)
+            if len(claimed) == limit:
+                break
+    return claimed
+
+
+def release_stale() -> int:
+    """
+    Задачи, которые исполнитель взял и не закончил за ``JOBS_LEASE``
+    секунд (процесс упал), возвращаются в очередь или, если попытки
+    кончились, считаются неудавшимися.
+    """
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=timezone.now() - timedelta(seconds=settings.JOBS_LEASE),
+    )
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, last_error='Исполнитель не завершил задачу',
+    )
+    return stale.update(status=Job.PENDING, locked_at=None, locked_by='')
+
+
+def run(job_id: int) -> str:
+    """
+    Выполняет взятую задачу. Удачная задача удаляется, неудачная
+    повторяется с растущей паузой, пока есть попытки.
+    """
+    job = Job.objects.filter(id=job_id).first()
+    if job is None:
+        return Job.DONE
+    try:
+        func = import_string(job.task)
+        if not hasattr(func, 'task_name'):
+            raise ValueError(f'{job.task} не объявлена через @task')
+        arguments = json.loads(job.arguments)
+        func(*arguments['args'], **arguments['kwargs'])
+    except Exception:
+        logger.exception('Задача %s не выполнена', job)
+        return _fail(job, traceback.format_exc())
+    Job.objects.filter(id=job.id).delete()
+    return Job.DONE
+
+
+def _fail(job: Job, error: str) -> str:
+    if job.attempts >= job.max_attempts:
+        status, run_at = Job.FAILED, job.run_at
+    else:
+        status = Job.PENDING
+        run_at = timezone.now() + timedelta(
+            seconds=settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+        )
+    Job.objects.filter(id=job.id).update(
+        status=status, run_at=run_at, last_error=error,
+        locked_at=None, locked_by='',
+    )
+    return status
+
+
+def _execute(job_id: int) -> str:
+    try:
+        return run(job_id)
+    finally:
+        connections.close_all()
+
+
+def _init_process():
+    import django
+
+    django.setup()
+    connections.close_all()
+
+
+class Worker:
+    """
+    Исполнитель очереди: берет готовые задачи и выполняет их в пуле
+    из ``concurrency`` потоков или процессов.
+    """
+
+    def __init__(self, concurrency: int = 1, executor: str = 'thread',
+                 poll: Optional[float] = None):
+        self.concurrency = concurrency
+        self.executor = executor
+        self.poll = settings.JOBS_POLL_INTERVAL if poll is None else poll
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopped = False
+
+    def make_executor(self):
+        if self.executor == 'process':
+            # Открытые соединения не должны достаться дочерним процессам.
+            connections.close_all()
+            return ProcessPoolExecutor(self.concurrency,
+                                       initializer=_init_process)
+        return ThreadPoolExecutor(self.concurrency,
+                                  thread_name_prefix='jobs')
+
+    def run(self, once: bool = False) -> dict:
+        """
+        Работает до ``stop()``; с ``once`` — пока в очереди есть готовые
+        задачи. Возвращает число задач по итоговому состоянию.
+        """
+        totals = dict.fromkeys([Job.DONE, Job.PENDING, Job.FAILED], 0)
+        running = set()
+        with self.make_executor() as executor:
+            while not self.stopped:
+                release_stale()
+                free = self.concurrency - len(running)
+                job_ids = claim(self.name, free) if free else []
+                running.update(executor.submit(_execute, job_id)
+                               for job_id in job_ids)
+                if not running:
+                    if once:
+                        break
+                    time.sleep(self.poll)
+                    continue
+                done, running = wait(running, timeout=self.poll,
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    totals[future.result()] += 1
+        return totals
+
+    def stop(self):
+        self.stopped = True
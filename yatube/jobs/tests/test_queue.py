@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs import queue
+from jobs.models import Job
+
+User = get_user_model()
+
+CALLS = []
+
+
+@queue.task(priority=5)
+def record(value):
+    CALLS.append(value)
+
+
+@queue.task(max_attempts=2)
+def explode():
+    raise RuntimeError('Сбой задачи')
+
+
+def not_a_task():
+    CALLS.append('запрещено')
+
+
+@override_settings(JOBS_EAGER=False)
+class QueueTest(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_delay_stores_call(self):
+        job = record.delay('значение')
+        self.assertEqual(job.task, 'jobs.tests.test_queue.record')
+        self.assertEqual(job.priority, 5)
+        self.assertEqual(CALLS, [])
+        self.assertEqual(queue.claim('test', 10), [job.id])
+        self.assertEqual(queue.run(job.id), Job.DONE)
+        self.assertEqual(CALLS, ['значение'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_priority_order(self):
+        low = queue.enqueue(record, ['low'], priority=0)
+        high = queue.enqueue(record, ['high'], priority=9)
+        self.assertEqual(queue.claim('test', 1), [high.id])
+        self.assertEqual(queue.claim('test', 1), [low.id])
+        self.assertEqual(queue.claim('test', 1), [])
+
+    def test_delayed_job_waits(self):
+        queue.enqueue(record, ['later'], countdown=60)
+        self.assertEqual(queue.claim('test', 1), [])
+
+    def test_claimed_once(self):
+        job = record.delay('значение')
+        self.assertTrue(queue.claim_one(job.id, 'first'))
+        self.assertFalse(queue.claim_one(job.id, 'second'))
+
+    def test_retry_then_fail(self):
+        job = explode.delay()
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            queue.claim('test', 1)
+            self.assertEqual(queue.run(job.id), Job.PENDING)
+        job.refresh_from_db()
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('Сбой задачи', job.last_error)
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            queue.claim('test', 1)
+            self.assertEqual(queue.run(job.id), Job.FAILED)
+
+    def test_only_declared_tasks_run(self):
+        job = Job.objects.create(
+            task='jobs.tests.test_queue.not_a_task', run_at=timezone.now(),
+        )
+        queue.claim('test', 1)
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            queue.run(job.id)
+        self.assertEqual(CALLS, [])
+
+    def test_release_stale(self):
+        job = record.delay('значение')
+        queue.claim('test', 1)
+        Job.objects.filter(id=job.id).update(
+            locked_at=timezone.now() - timedelta(days=1)
+        )
+        self.assertEqual(queue.release_stale(), 1)
+        self.assertEqual(queue.claim('test', 1), [job.id])
+
+    def test_password_reset_mail_queued(self):
+        User.objects.create_user('user', 'user@example.com', 'пароль')
+        self.client.post(reverse('users:password_reset_form'),
+                         {'email': 'user@example.com'})
+        self.assertEqual(mail.outbox, [])
+        job = Job.objects.get()
+        self.assertEqual(job.task, 'users.tasks.send_email')
+        queue.claim('test', 1)
+        queue.run(job.id)
+        self.assertEqual(mail.outbox[0].to, ['user@example.com'])
+
+
+class WorkerTest(TransactionTestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_after_commit(self):
+        """Без исполнителя задача выполняется только после коммита."""
+        with transaction.atomic():
+            record.delay('после коммита')
+            self.assertEqual(CALLS, [])
+        self.assertEqual(CALLS, ['после коммита'])
+        self.assertFalse(Job.objects.exists())
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                record.delay('откат')
+                raise RuntimeError
+        self.assertEqual(CALLS, ['после коммита'])
+
+    @override_settings(JOBS_EAGER=False)
+    def test_worker_drains_queue(self):
+        """
+        Один поток и долгое ожидание: тестовая база SQLite в памяти не
+        ждет блокировок, поэтому цикл не должен опрашивать ее, пока
+        задача выполняется.
+        """
+        for i in range(5):
+            record.delay(i)
+        totals = queue.Worker(concurrency=1, poll=10).run(once=True)
+        self.assertEqual(totals[Job.DONE], 5)
+        self.assertEqual(sorted(CALLS), list(range(5)))
+        self.assertFalse(Job.objects.exists())
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from . import search, thumbnails
 from .models import Post, Group
 
 
@@ -8,19 +9,33 @@ class PostAdmin(admin.ModelAdmin):
         'text',
         'pub_date',
         'author',
-        'group'
+        'group',
+        'comments_count',
+        'views_count',
     )
     list_editable = ('group',)
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.filter(id__in=search.search(search_term)), False
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if 'image' in form.changed_data:
+            thumbnails.schedule(obj)
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = (
         'title',
         'slug',
-        'description'
+        'description',
+        'posts_count',
+        'views_count',
     )
     empty_value_display = '-пусто-'
 
@@ -0,0 +1,228 @@
+from functools import wraps
+from typing import Iterable
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.paginator import InvalidPage
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from . import page_cache
+from .feed import follow_feed, follow_feed_count
+from .models import Group, Post, UserStats
+from .utils import CursorPaginator, comments_pagik
+
+User = get_user_model()
+
+POST_COLUMNS = {
+    'id': 'id',
+    'text': 'text',
+    'title': 'title',
+    'excerpt': 'excerpt',
+    'word_count': 'word_count',
+    'pub_date': 'pub_date',
+    'image': 'image',
+    'comments_count': 'comments_count',
+    'views_count': 'views_count',
+    'author': 'author_id',
+    'group': 'group_id',
+}
+"""Поля поста в ответе и столбцы, которые для них читаются."""
+AUTHOR_FIELDS = ['id', 'username', 'first_name', 'last_name']
+GROUP_FIELDS = ['id', 'slug', 'title']
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def _response(data: dict, status: int = 200) -> JsonResponse:
+    return JsonResponse(data, status=status,
+                        json_dumps_params={'ensure_ascii': False})
+
+
+def api_view(view):
+    """Только GET; ``ApiError`` превращается в JSON с кодом ответа."""
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return _response(view(request, *args, **kwargs))
+        except ApiError as error:
+            return _response({'error': str(error)}, error.status)
+    return wrapper
+
+
+def _fields(request) -> list[str]:
+    """Поля из ``?fields=id,text``; по умолчанию — все."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(POST_COLUMNS)
+    fields = [field for field in raw.split(',') if field]
+    unknown = set(fields) - set(POST_COLUMNS)
+    if unknown:
+        raise ApiError(f"Неизвестные поля: {', '.join(sorted(unknown))}")
+    return fields
+
+
+def _limit(request) -> int:
+    raw = request.GET.get('limit', str(settings.COUNT_POSTS))
+    if not raw.isdigit() or int(raw) < 1:
+        raise ApiError('limit должен быть целым положительным числом')
+    return min(int(raw), settings.API_PAGE_MAX)
+
+
+def _related(model, ids: Iterable[int], fields: list[str]) -> dict:
+    """Связанные строки одним запросом: ``{id: {поле: значение}}``."""
+    ids = set(ids) - {None}
+    if not ids:
+        return {}
+    return {
+        row['id']: row
+        for row in model.objects.filter(id__in=ids).values(*fields)
+    }
+
+
+def dump_posts(posts: list[Post], fields: list[str]) -> list[dict]:
+    """
+    Посты в словари без шаблонов и без ``select_related``: авторы и
+    группы всей страницы читаются двумя запросами по id.
+    """
+    authors = groups = {}
+    if 'author' in fields:
+        authors = _related(User, (post.author_id for post in posts),
+                           AUTHOR_FIELDS)
+    if 'group' in fields:
+        groups = _related(Group, (post.group_id for post in posts),
+                          GROUP_FIELDS)
+    rows = []
+    for post in posts:
+        row = {}
+        for field in fields:
+            if field == 'author':
+                row[field] = authors.get(post.author_id)
+            elif field == 'group':
+                row[field] = groups.get(post.group_id)
+            elif field == 'image':
+                row[field] = post.image.url if post.image else None
+            else:
+                row[field] = getattr(post, field)
+        rows.append(row)
+    return rows
+
+
+def posts_page(request, post_list, count=None, estimated=False) -> dict:
+    """
+    Страница постов по курсору (``?cursor=``) из готового QuerySet'а
+    вида: читаются только столбцы выбранных полей и ключи сортировки.
+    ``count`` и ``estimated`` — как у ``page_pagik``.
+    """
+    fields = _fields(request)
+    columns = {'id', 'pub_date', *(POST_COLUMNS[field] for field in fields)}
+    post_list = post_list.select_related(None).defer(None).only(*columns)
+    paginator = CursorPaginator(post_list, _limit(request), count=count,
+                                estimated=estimated)
+    cursor = request.GET.get('cursor')
+    try:
+        page = (paginator.cursor_page(cursor) if cursor
+                else paginator.page(1))
+    except InvalidPage as error:
+        raise ApiError(str(error))
+    return {
+        'count': paginator.count,
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+        'results': dump_posts(page.object_list, fields),
+    }
+
+
+def _get(queryset, message: str, **lookup):
+    obj = queryset.filter(**lookup).first()
+    if obj is None:
+        raise ApiError(message, 404)
+    return obj
+
+
+@api_view
+def posts_list(request) -> dict:
+    """Главная лента; длина — из кеша, как у ``views.index``."""
+    return posts_page(
+        request, Post.objects.cards(),
+        count=lambda: page_cache.feed_count(page_cache.main_feed(),
+                                            Post.objects.count),
+        estimated=True,
+    )
+
+
+@api_view
+def post_detail(request, post_id: int) -> dict:
+    """Пост и страница его комментариев (следующие — по ``?cursor=``)."""
+    post = _get(Post.objects, 'Пост не найден', id=post_id)
+    comments = comments_pagik(request, post)
+    row = dump_posts([post], _fields(request))[0]
+    row['comments'] = {
+        'count': comments.paginator.count,
+        'next': comments.next_cursor,
+        'previous': comments.previous_cursor,
+        'results': [
+            {
+                'id': comment.id,
+                'text': comment.text,
+                'created': comment.created,
+                'author': {name: getattr(comment.author, name)
+                           for name in AUTHOR_FIELDS},
+            }
+            for comment in comments
+        ],
+    }
+    return row
+
+
+@api_view
+def group_detail(request, slug: str) -> dict:
+    group = _get(Group.objects, 'Группа не найдена', slug=slug)
+    return {
+        'group': {
+            'id': group.id,
+            'slug': group.slug,
+            'title': group.title,
+            'description': group.description,
+            'posts_count': group.posts_count,
+            'views_count': group.views_count,
+        },
+        'posts': posts_page(request, group.posts.cards(),
+                            count=lambda: group.posts_count,
+                            estimated=True),
+    }
+
+
+@api_view
+def profile_detail(request, username: str) -> dict:
+    author = _get(User.objects, 'Автор не найден', username=username)
+    stats = UserStats.of(author)
+    return {
+        'profile': {
+            'id': author.id,
+            'username': author.username,
+            'full_name': author.get_full_name(),
+            'posts_count': stats.posts_count,
+            'followers_count': stats.followers_count,
+            'following_count': stats.following_count,
+        },
+        'posts': posts_page(request, author.posts.cards(),
+                            count=lambda: stats.posts_count,
+                            estimated=True),
+    }
+
+
+@api_view
+def follow_list(request) -> dict:
+    """Лента избранных авторов текущего пользователя."""
+    if not request.user.is_authenticated:
+        raise ApiError('Нужно войти', 401)
+    post_list = follow_feed(request.user)
+    return posts_page(
+        request, post_list,
+        count=lambda: follow_feed_count(request.user, post_list),
+    )
@@ -0,0 +1,340 @@
+import asyncio
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from core.asgi import WsgiToAsgi
+from . import counters, feed, search
+from .models import Comment, Follow, Group, Post
+from .urls import urlpatterns
+
+User = get_user_model()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+"""Картинка 2×1 для синтетических постов и тестов."""
+
+
+def seed(users=50, groups=10, posts=5000, comments=10000, follows=500,
+         images=0.2, index=False, rng=None):
+    """
+    Заполняет базу синтетическими данными пакетными INSERT.
+
+    bulk_create обходит сигналы, поэтому счетчики, ленты подписчиков
+    и (по ``index``) поисковый индекс достраиваются отдельно.
+    """
+    rng = rng or random.Random(0)
+    password = make_password(None)
+    User.objects.bulk_create([
+        User(username=f'bench_{i}', first_name=f'Имя{i}',
+             last_name=f'Фамилия{i}', password=password)
+        for i in range(users)
+    ])
+    user_ids = list(User.objects.filter(
+        username__startswith='bench_'
+    ).values_list('id', flat=True))
+    Group.objects.bulk_create([
+        Group(title=f'Группа {i}', slug=f'bench-{i}', description='Группа')
+        for i in range(groups)
+    ])
+    group_ids = list(Group.objects.filter(
+        slug__startswith='bench-'
+    ).values_list('id', flat=True))
+    image = default_storage.save('posts/bench.gif', ContentFile(SMALL_GIF))
+    words = ('книга', 'сад', 'дождь', 'город', 'кот', 'море', 'лето',
+             'письмо', 'дорога', 'песня', 'утро', 'окно')
+    posts_list = [
+        Post(
+            text=' '.join(rng.choices(words, k=rng.randint(5, 60))),
+            author_id=rng.choice(user_ids),
+            group_id=rng.choice(group_ids + [None]),
+            image=image if rng.random() < images else '',
+        )
+        for _ in range(posts)
+    ]
+    for post in posts_list:
+        post.summarize()
+    Post.objects.bulk_create(posts_list)
+    post_ids = list(Post.objects.values_list('id', flat=True))
+    Comment.objects.bulk_create([
+        Comment(post_id=rng.choice(post_ids), author_id=rng.choice(user_ids),
+                text='Комментарий')
+        for _ in range(comments)
+    ])
+    pairs = {
+        tuple(rng.sample(user_ids, 2))
+        for _ in range(min(follows, len(user_ids) * (len(user_ids) - 1)))
+    }
+    Follow.objects.bulk_create(
+        [Follow(user_id=user, author_id=author) for user, author in pairs],
+        ignore_conflicts=True,
+    )
+    counters.reconcile()
+    for author_id in set(author for _, author in pairs):
+        followers = [user for user, author in pairs if author == author_id]
+        feed.backfill(followers, author_id)
+    if index:
+        for post in Post.objects.only('id', 'text').iterator():
+            search.index_post(post)
+
+
+class Timer:
+    """Считает запросы к БД и время, проведенное в них."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+def percentile(values: list[float], share: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(share * len(values)) - 1))
+    return values[index]
+
+
+@contextmanager
+def _sacrificial_post(author):
+    post = Post.objects.create(text='Пост для удаления', author=author)
+    yield {'post_id': post.id}
+    Post.objects.filter(id=post.id).delete()
+
+
+def _targets(user, author, post, group):
+    """Параметры URL для каждого маршрута posts.urls."""
+    simple = {
+        'slug': group.slug,
+        'username': author.username,
+        'post_id': post.id,
+    }
+    for pattern in urlpatterns:
+        name = f'posts:{pattern.name}'
+        if pattern.name == 'post_delete':
+            yield name, lambda: _sacrificial_post(user)
+            continue
+        kwargs = {
+            key: simple[key] for key in pattern.pattern.converters
+        }
+        if pattern.name == 'post_edit':
+            kwargs['post_id'] = (
+                user.posts.values_list('id', flat=True).first()
+            )
+        yield name, (lambda kwargs=kwargs: _fixed(kwargs))
+
+
+@contextmanager
+def _fixed(kwargs):
+    yield kwargs
+
+
+def run(iterations=20, warmup=3, cold_cache=False) -> dict:
+    """Прогоняет все маршруты posts.urls и собирает метрики по каждому."""
+    user = User.objects.filter(follower__isnull=False).first()
+    author = User.objects.filter(posts__isnull=False).exclude(
+        id=user.id
+    ).first()
+    post = Post.objects.first()
+    group = Group.objects.first()
+    if user.posts.count() == 0:
+        Post.objects.create(text='Пост для правки', author=user)
+    client = Client()
+    client.force_login(user)
+
+    results = {}
+    for name, setup in _targets(user, author, post, group):
+        latencies, queries, db_times, statuses = [], [], [], set()
+        for i in range(warmup + iterations):
+            with setup() as kwargs:
+                url = reverse(name, kwargs=kwargs)
+                if cold_cache:
+                    cache.clear()
+                timer = Timer()
+                with connection.execute_wrapper(timer):
+                    start = time.perf_counter()
+                    response = client.get(url)
+                    elapsed = time.perf_counter() - start
+            if i < warmup:
+                continue
+            statuses.add(response.status_code)
+            latencies.append(elapsed * 1000)
+            queries.append(timer.queries)
+            db_times.append(timer.db_time * 1000)
+        results[name] = {
+            'p50_ms': round(percentile(latencies, 0.5), 3),
+            'p90_ms': round(percentile(latencies, 0.9), 3),
+            'p99_ms': round(percentile(latencies, 0.99), 3),
+            'max_ms': round(max(latencies), 3),
+            'queries': max(queries),
+            'db_ms': round(statistics.median(db_times), 3),
+            'statuses': sorted(statuses),
+        }
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Регрессии относительно сохраненного прогона."""
+    problems = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if metrics['queries'] > base['queries']:
+            problems.append(
+                f"{name}: запросов {metrics['queries']} "
+                f"вместо {base['queries']}"
+            )
+        limit = base['p90_ms'] * (1 + tolerance)
+        if metrics['p90_ms'] > limit:
+            problems.append(
+                f"{name}: p90 {metrics['p90_ms']} мс "
+                f"при допустимых {limit:.3f} мс"
+            )
+    return problems
+
+
+def read_urls(user) -> list[tuple[str, str]]:
+    """Страницы чтения и cookie сессии, с которой их открывать."""
+    client = Client()
+    client.force_login(user)
+    cookie = f"sessionid={client.cookies['sessionid'].value}"
+    author = User.objects.filter(posts__isnull=False).first()
+    return [
+        (reverse('posts:main'), ''),
+        (reverse('posts:group_list', args=[Group.objects.first().slug]), ''),
+        (reverse('posts:profile', args=[author.username]), ''),
+        (reverse('posts:post_detail', args=[Post.objects.first().id]), ''),
+        (reverse('posts:follow_index'), cookie),
+    ]
+
+
+def slow_database(application, delay: float):
+    """WSGI-приложение, у которого каждый запрос к БД дольше на delay."""
+    def slow(execute, sql, params, many, context):
+        time.sleep(delay)
+        return execute(sql, params, many, context)
+
+    def wrapper(environ, start_response):
+        with connection.execute_wrapper(slow):
+            return application(environ, start_response)
+    return wrapper
+
+
+def _scope(url: str, cookie: str) -> dict:
+    parts = urlsplit(url)
+    headers = [(b'host', b'testserver')]
+    if cookie:
+        headers.append((b'cookie', cookie.encode()))
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': parts.path,
+        'query_string': parts.query.encode(),
+        'headers': headers,
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 0),
+    }
+
+
+def _wsgi_round(application, requests, threads, client_delay):
+    """Поток на запрос: поток ждет и медленного клиента, и БД."""
+    adapter = WsgiToAsgi(application, 1)
+
+    def handle(url, cookie, start):
+        time.sleep(client_delay)
+        sent = []
+        adapter.run_wsgi(adapter.environ(_scope(url, cookie), b''),
+                         sent.append, threading.Event())
+        return sent[0]['status'], time.perf_counter() - start
+
+    with ThreadPoolExecutor(threads) as executor:
+        futures = [
+            executor.submit(handle, *request, time.perf_counter())
+            for request in requests
+        ]
+        return [future.result() for future in futures]
+
+
+def _asgi_round(application, requests, threads, client_delay):
+    """Медленного клиента ждет цикл событий, потоки заняты только видом."""
+    adapter = WsgiToAsgi(application, threads)
+
+    async def handle(url, cookie):
+        start = time.perf_counter()
+        sent = []
+
+        async def receive():
+            await asyncio.sleep(client_delay)
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            sent.append(message)
+
+        await adapter(_scope(url, cookie), receive, send)
+        return sent[0]['status'], time.perf_counter() - start
+
+    async def main():
+        return await asyncio.gather(*(
+            handle(*request) for request in requests
+        ))
+
+    try:
+        return asyncio.run(main())
+    finally:
+        adapter.executor.shutdown()
+
+
+def concurrency(clients=50, threads=8, db_delay=0.005, client_delay=0.05,
+                rounds=3) -> dict:
+    """
+    Сравнивает WSGI (поток на запрос) и ASGI-адаптер при одинаковом
+    числе потоков, медленной БД и медленных клиентах.
+    """
+    user = User.objects.filter(follower__isnull=False).first()
+    urls = read_urls(user)
+    requests = [urls[i % len(urls)] for i in range(clients)]
+    application = slow_database(WSGIHandler(), db_delay)
+    results = {}
+    for mode, round_ in (('wsgi', _wsgi_round), ('asgi', _asgi_round)):
+        latencies, statuses, elapsed = [], set(), 0.0
+        for _ in range(rounds):
+            cache.clear()
+            start = time.perf_counter()
+            replies = round_(application, requests, threads, client_delay)
+            elapsed += time.perf_counter() - start
+            statuses.update(status for status, _ in replies)
+            latencies.extend(latency * 1000 for _, latency in replies)
+        results[mode] = {
+            'rps': round(clients * rounds / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 0.5), 3),
+            'p99_ms': round(percentile(latencies, 0.99), 3),
+            'statuses': sorted(statuses),
+        }
+    return results
@@ -0,0 +1,46 @@
+import hashlib
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from core import caching
+from .models import Post
+
+
+def card_version(post: Post) -> str:
+    """
+    Версия карточки — отпечаток всего, что она показывает.
+
+    Правка поста, смена имени автора или адреса группы дают новую
+    версию без отдельного счетчика и без похода в кеш за ним.
+    """
+    author, group = post.author, post.group
+    parts = (
+        post.excerpt, post.pub_date.isoformat(), post.image.name,
+        post.image_thumbnail, author.username, author.first_name,
+        author.last_name, group.slug if group else '',
+    )
+    return hashlib.md5('\0'.join(parts).encode()).hexdigest()
+
+
+def render_cards(posts, template_name: str) -> list[str]:
+    """
+    HTML карточек постов: готовые берутся из кеша одним get_many,
+    недостающие рисуются и кладутся одним set_many.
+    """
+    posts = list(posts)
+    keys = [
+        (template_name, post.id, card_version(post))
+        for post in posts
+    ]
+    cached = caching.get_many('post_card', keys)
+    missing = {}
+    cards = []
+    for key, post in zip(keys, posts):
+        card = cached.get(key)
+        if card is None:
+            card = missing[key] = render_to_string(template_name,
+                                                   {'post': post})
+        cards.append(card)
+    if missing:
+        caching.set_many('post_card', missing, settings.CARD_CACHE)
+    return cards
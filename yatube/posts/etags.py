@@ -0,0 +1,94 @@
+import hashlib
+import time
+from datetime import date
+from functools import partial, wraps
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from . import page_cache
+from .models import Group, Post
+
+User = get_user_model()
+
+
+def views_window() -> int:
+    """
+    Номер окна длиной ``TIME_CACHE``. Просмотры не сдвигают версии лент
+    (иначе каждый сброс счетчиков сбрасывал бы кеш и ETag страниц),
+    поэтому счетчик на странице отстает не дольше окна.
+    """
+    return int(time.time() // settings.TIME_CACHE)
+
+
+def _etag(request, *feeds: str, views: bool = False) -> str:
+    """
+    Версии лент страницы и имен (``page_cache.names_feed``), ее адрес
+    и позиция, зритель (шапка и кнопки зависят от него), год из подвала
+    и, если на странице есть счетчик просмотров, окно ``views_window``:
+    ответ меняется только вместе с ними.
+    """
+    feeds = (*feeds, page_cache.names_feed())
+    parts = (
+        *((feed, page_cache.feed_version(feed)) for feed in feeds),
+        request.path, page_cache.page_position(request),
+        request.user.pk or 0, date.today().year,
+        views_window() if views else None,
+    )
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def _per_request(feeds_func=None, *, views: bool = False):
+    """
+    ETag по лентам, которые вернула ``feeds_func``; ``None`` — объекта
+    нет. Считается один раз за запрос: его читают и ``condition``,
+    и кеш страниц для анонимов.
+    """
+    if feeds_func is None:
+        return partial(_per_request, views=views)
+    attribute = f'_etag_{feeds_func.__name__}'
+
+    @wraps(feeds_func)
+    def wrapper(request, *args, **kwargs) -> Optional[str]:
+        if not hasattr(request, attribute):
+            feeds = feeds_func(*args, **kwargs)
+            setattr(request, attribute, None if feeds is None
+                    else _etag(request, *feeds, views=views))
+        return getattr(request, attribute)
+    return wrapper
+
+
+@_per_request
+def index() -> list[str]:
+    return [page_cache.main_feed()]
+
+
+@_per_request(views=True)
+def group_posts(slug) -> Optional[list[str]]:
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'id', flat=True
+    ).first()
+    if group_id is None:
+        return None
+    return [page_cache.group_feed(group_id)]
+
+
+@_per_request
+def profile(username) -> Optional[list[str]]:
+    author_id = User.objects.filter(username=username).values_list(
+        'id', flat=True
+    ).first()
+    if author_id is None:
+        return None
+    return [page_cache.profile_feed(author_id)]
+
+
+@_per_request(views=True)
+def post_detail(post_id) -> Optional[list[str]]:
+    """Пост и профиль автора (на странице — число его постов)."""
+    author_id = Post.objects.filter(id=post_id).values_list(
+        'author_id', flat=True
+    ).first()
+    if author_id is None:
+        return None
+    return [page_cache.post_page(post_id), page_cache.profile_feed(author_id)]
@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.db.models import F, Q
+from .models import FeedEntry, Follow, Post, UserStats
+
+
+def is_pull_author(author_id: int) -> bool:
+    """
+    Автор слишком популярен для рассылки постов по лентам:
+    его посты подмешиваются в ленту при чтении (fan-out-on-read).
+    """
+    return UserStats.objects.filter(
+        user_id=author_id,
+        followers_count__gte=settings.FEED_FANOUT_LIMIT,
+    ).exists()
+
+
+def _bulk_add(entries: list[FeedEntry]):
+    FeedEntry.objects.bulk_create(
+        entries,
+        batch_size=settings.FEED_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def fan_out_post(post: Post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    if is_pull_author(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    _bulk_add([
+        FeedEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in followers.iterator()
+    ])
+
+
+def backfill(user_ids: list[int], author_id: int):
+    """Добавляет последние посты автора в ленты подписчиков."""
+    posts = list(
+        Post.objects.filter(author_id=author_id)
+        .order_by('-pub_date', '-id')
+        .values_list('id', 'pub_date')[:settings.FEED_BACKFILL]
+    )
+    _bulk_add([
+        FeedEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+        for user_id in user_ids
+        for post_id, pub_date in posts
+    ])
+
+
+def repair_on_follow(follow: Follow):
+    """Подписка: лента пополняется постами нового автора."""
+    if not is_pull_author(follow.author_id):
+        backfill([follow.user_id], follow.author_id)
+
+
+def repair_on_unfollow(follow: Follow):
+    """
+    Отписка: из ленты убираются посты автора.
+
+    Если автор опустился ниже порога популярности, его посты снова
+    рассылаются по лентам, поэтому ленты оставшихся подписчиков
+    дозаполняются.
+    """
+    FeedEntry.objects.filter(
+        user_id=follow.user_id,
+        post__author_id=follow.author_id,
+    ).delete()
+    stats = UserStats.of(follow.author_id)
+    if stats.followers_count == settings.FEED_FANOUT_LIMIT - 1:
+        followers = Follow.objects.filter(author_id=follow.author_id)
+        backfill(
+            list(followers.values_list('user_id', flat=True)),
+            follow.author_id,
+        )
+
+
+def pull_authors(user) -> list[int]:
+    """Популярные авторы из подписок пользователя."""
+    return list(
+        Follow.objects.filter(
+            user=user,
+            author__stats__followers_count__gte=settings.FEED_FANOUT_LIMIT,
+        ).values_list('author_id', flat=True)
+    )
+
+
+def follow_feed(user):
+    """
+    Лента избранных авторов.
+
+    Обычный случай — чтение диапазона индекса ``feed_user_date_idx``.
+    Посты популярных авторов подмешиваются при чтении.
+    """
+    posts = Post.objects.cards()
+    authors = pull_authors(user)
+    if not authors:
+        return posts.filter(feed_entries__user=user).annotate(
+            feed_date=F('feed_entries__pub_date'),
+            feed_post=F('feed_entries__post'),
+        ).order_by('-feed_date', '-feed_post')
+    entries = FeedEntry.objects.filter(user=user).values('post_id')
+    return posts.filter(
+        Q(id__in=entries) | Q(author_id__in=authors)
+    ).order_by('-pub_date', '-id')
+
+
+def follow_feed_count(user, post_list) -> int:
+    """Длина ленты без подзапроса с группировкой по аннотациям."""
+    if 'feed_date' in post_list.query.annotations:
+        return FeedEntry.objects.filter(user=user).count()
+    return post_list.count()
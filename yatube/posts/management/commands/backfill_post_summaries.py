@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from posts.models import Post
+
+SUMMARY_FIELDS = ['title', 'excerpt', 'word_count']
+
+
+class Command(BaseCommand):
+    help = ('Заполняет заголовок, начало текста и число слов постов. '
+            'Нужен с --all после смены COUNT_WORDS_POST или '
+            'COUNT_CHAR_POST_TITLE; при миграции сводка заполняется сама.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='пересчитать и уже заполненные посты')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        posts = Post.objects.only('id', 'text').order_by('id')
+        if not options['all']:
+            posts = posts.filter(title='')
+        batch_size = options['batch_size']
+        count = 0
+        batch = []
+        for post in posts.iterator(chunk_size=batch_size):
+            post.summarize()
+            batch.append(post)
+            if len(batch) == batch_size:
+                count += self.flush(batch)
+                batch = []
+        count += self.flush(batch)
+        self.stdout.write(f'Обработано постов: {count}')
+
+    @staticmethod
+    @transaction.atomic
+    def flush(batch: list[Post]) -> int:
+        Post.objects.bulk_update(batch, SUMMARY_FIELDS)
+        return len(batch)
@@ -0,0 +1,53 @@
+import shutil
+import tempfile
+
+from django.core.management.base import BaseCommand
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает WSGI и ASGI на страницах чтения posts при медленной '
+        'БД и медленных клиентах: пропускная способность и задержки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--clients', type=int, default=50,
+                            help='Одновременных запросов.')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Потоков у каждого сервера.')
+        parser.add_argument('--db-delay', type=float, default=0.005,
+                            help='Добавка к каждому запросу к БД, с.')
+        parser.add_argument('--client-delay', type=float, default=0.05,
+                            help='Время приема запроса от клиента, с.')
+        parser.add_argument('--rounds', type=int, default=3)
+
+    def handle(self, *args, **options):
+        runner = DiscoverRunner(verbosity=0)
+        old_config = runner.setup_databases()
+        media_root = tempfile.mkdtemp()
+        try:
+            with override_settings(DEBUG=False, MEDIA_ROOT=media_root):
+                benchmark.seed(posts=options['posts'],
+                               comments=options['posts'])
+                results = benchmark.concurrency(
+                    clients=options['clients'],
+                    threads=options['threads'],
+                    db_delay=options['db_delay'],
+                    client_delay=options['client_delay'],
+                    rounds=options['rounds'],
+                )
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+            runner.teardown_databases(old_config)
+
+        for mode, metrics in results.items():
+            self.stdout.write(
+                f"{mode}  {metrics['rps']:>8} запр/с  "
+                f"p50 {metrics['p50_ms']:>9} мс  "
+                f"p99 {metrics['p99_ms']:>9} мс  "
+                f"ответы {metrics['statuses']}"
+            )
@@ -0,0 +1,101 @@
+import json
+import shutil
+import tempfile
+from contextlib import contextmanager, nullcontext
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+from posts import benchmark
+
+
+@contextmanager
+def rolled_back():
+    """
+    Прогон в текущей базе без следов: транзакция откатывается, а кеш,
+    где остались страницы с откаченными постами, очищается.
+    """
+    try:
+        with transaction.atomic():
+            try:
+                yield
+            finally:
+                transaction.set_rollback(True)
+    finally:
+        cache.clear()
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный прогон всех страниц posts: задержки, число запросов '
+        'и время в БД. Сравнивает результат с сохраненным JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--follows', type=int, default=500)
+        parser.add_argument('--images', type=float, default=0.2,
+                            help='Доля постов с картинкой.')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--cold-cache', action='store_true',
+                            help='Очищать кеш перед каждым запросом.')
+        parser.add_argument('--output',
+                            help='Куда записать результаты (JSON).')
+        parser.add_argument('--baseline',
+                            help='JSON предыдущего прогона для сравнения.')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Допустимый рост p90, доля.')
+        parser.add_argument('--current-db', action='store_true',
+                            help='Не создавать временную базу: данные '
+                                 'прогона откатываются, кеш очищается.')
+
+    def handle(self, *args, **options):
+        runner = None
+        if not options['current_db']:
+            runner = DiscoverRunner(verbosity=0)
+            old_config = runner.setup_databases()
+        scope = rolled_back() if runner is None else nullcontext()
+        media_root = tempfile.mkdtemp()
+        try:
+            with override_settings(DEBUG=False, MEDIA_ROOT=media_root), scope:
+                benchmark.seed(
+                    users=options['users'],
+                    groups=options['groups'],
+                    posts=options['posts'],
+                    comments=options['comments'],
+                    follows=options['follows'],
+                    images=options['images'],
+                )
+                results = benchmark.run(
+                    iterations=options['iterations'],
+                    warmup=options['warmup'],
+                    cold_cache=options['cold_cache'],
+                )
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+            if runner is not None:
+                runner.teardown_databases(old_config)
+
+        for name, metrics in results.items():
+            self.stdout.write(
+                f"{name:<28} p50 {metrics['p50_ms']:>8} мс  "
+                f"p90 {metrics['p90_ms']:>8} мс  "
+                f"запросов {metrics['queries']:>3}  "
+                f"БД {metrics['db_ms']:>8} мс"
+            )
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+        if options['baseline']:
+            with open(options['baseline']) as file:
+                baseline = json.load(file)
+            problems = benchmark.compare(results, baseline,
+                                         options['tolerance'])
+            if problems:
+                raise CommandError('\n'.join(problems))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает пользователей, группы, посты, комментарии и подписки '
+        'в NDJSON (по строке на запись), не загружая базу в память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output',
+                            help='Файл (.gz — сжатый) или - для stdout.')
+        parser.add_argument('--media-dir',
+                            help='Куда скопировать картинки постов.')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        with transfer.open_stream(options['output'], 'w') as stream:
+            totals = transfer.export(stream, options['media_dir'],
+                                     options['chunk_size'])
+        for name, count in totals.items():
+            self.stderr.write(f'{name}: {count}')
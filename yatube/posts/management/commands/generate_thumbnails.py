@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from posts.models import Post
+from posts.thumbnails import generate
+
+
+class Command(BaseCommand):
+    help = 'Готовит миниатюры для постов, у которых их еще нет.'
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').filter(
+            image_thumbnail=''
+        ).values_list('id', flat=True)
+        count = 0
+        for post_id in posts.iterator():
+            generate(post_id)
+            count += 1
+        self.stdout.write(f'Обработано постов: {count}')
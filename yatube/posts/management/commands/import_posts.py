@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает выгрузку export_posts пачками через bulk_create, '
+        'затем пересчитывает счетчики и ленты подписок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('input',
+                            help='Файл (.gz — сжатый) или - для stdin.')
+        parser.add_argument('--media-dir',
+                            help='Откуда взять картинки постов.')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--no-index', action='store_true',
+                            help='Не обновлять поисковый индекс.')
+
+    def handle(self, *args, **options):
+        importer = transfer.Importer(
+            media_dir=options['media_dir'],
+            batch_size=options['batch_size'],
+            index=not options['no_index'],
+        )
+        with transfer.open_stream(options['input'], 'r') as stream:
+            totals = importer.load(stream)
+        for name, count in totals.items():
+            self.stdout.write(f'{name}: {count}')
+        for name, count in importer.skipped.items():
+            if count:
+                self.stderr.write(f'{name}: пропущено {count}')
+        self.stdout.write(
+            'Миниатюры картинок готовит команда generate_thumbnails.'
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from posts.models import Post
+from posts.search import index_post
+
+
+class Command(BaseCommand):
+    help = 'Заново строит поисковый индекс по всем постам.'
+
+    def handle(self, *args, **options):
+        count = 0
+        for post in Post.objects.only('id', 'text').iterator():
+            index_post(post)
+            count += 1
+        self.stdout.write(f'Проиндексировано постов: {count}')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from posts.trending import recompute
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает популярность недавних постов и групп. '
+            'Запускается по расписанию, например раз в час.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window', type=int, default=None,
+                            help='за сколько секунд брать посты '
+                                 '(по умолчанию TRENDING_WINDOW)')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = recompute(options['window'])
+        self.stdout.write(f'Пересчитано постов: {count}')
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from posts.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счетчики постов, комментариев и подписок.'
+
+    def handle(self, *args, **options):
+        for name, count in reconcile().items():
+            self.stdout.write(f'{name}: исправлено {count}')
@@ -0,0 +1,36 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0010_auto_20230328_2129'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to='posts.Post', verbose_name='Пост')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to=settings.AUTH_USER_MODEL, verbose_name='Подписчик')),
+            ],
+            options={
+                'ordering': ['-pub_date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['user', '-pub_date', '-post'], name='feed_user_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='feedentry',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_feed_user_post'),
+        ),
+    ]
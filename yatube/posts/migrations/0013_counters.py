@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0012_post_ordering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Количество постов')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='Количество подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Количество подписок')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество постов'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+    ]
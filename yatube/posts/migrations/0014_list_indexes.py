@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_counters'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'ordering': ['created', 'id']},
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created', 'id'], name='comment_post_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['user', 'author'], name='follow_user_author_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-pub_date', '-id'], name='post_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='post_author_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-pub_date', '-id'], name='post_group_date_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:42
+
+from django.db import OperationalError, migrations, models
+import django.db.models.deletion
+
+
+def create_fts_table(apps, schema_editor):
+    """Таблица FTS5 создается, только если SQLite собран с ее поддержкой."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts '
+            'USING fts5(stems)'
+        )
+    except OperationalError:
+        pass
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS posts_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_post_image_thumbnail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Основа слова')),
+                ('weight', models.PositiveIntegerField(default=1, verbose_name='Число вхождений')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='posts.Post', verbose_name='Пост')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(fields=('term', 'post'), name='unique_search_term_post'),
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Начало текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='title',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Заголовок'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество слов'),
+        ),
+    ]
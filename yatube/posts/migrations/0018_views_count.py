@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_post_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='views_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество просмотров постов'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='views_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество просмотров'),
+        ),
+    ]
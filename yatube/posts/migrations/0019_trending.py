@@ -0,0 +1,39 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:48
+
+import datetime
+from django.db import migrations, models
+from django.utils.timezone import utc
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_views_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='follow',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, default=datetime.datetime(1970, 1, 1, 0, 0, tzinfo=utc), verbose_name='Дата подписки'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='trending_score',
+            field=models.FloatField(default=0.0, editable=False, verbose_name='Популярность'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='trending_score',
+            field=models.FloatField(default=0.0, editable=False, verbose_name='Популярность'),
+        ),
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(fields=['-trending_score', '-id'], name='group_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-trending_score', '-id'], name='post_trending_idx'),
+        ),
+    ]
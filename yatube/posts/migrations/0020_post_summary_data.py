@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.db import migrations
+from django.utils.text import Truncator
+
+SUMMARY_FIELDS = ['title', 'excerpt', 'word_count']
+BATCH_SIZE = 500
+
+
+def fill_summaries(apps, schema_editor):
+    """
+    Заголовок, начало текста и число слов уже созданных постов — так же,
+    как ``Post.summarize``; иначе карточки и заголовки были бы пустыми
+    до запуска ``backfill_post_summaries``.
+    """
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.filter(title='').only('id', 'text').order_by('id')
+    batch = []
+    for post in posts.iterator(chunk_size=BATCH_SIZE):
+        truncator = Truncator(post.text)
+        post.title = truncator.chars(settings.COUNT_CHAR_POST_TITLE)
+        post.excerpt = truncator.words(settings.COUNT_WORDS_POST,
+                                       truncate=' …')
+        post.word_count = len(post.text.split())
+        batch.append(post)
+        if len(batch) == BATCH_SIZE:
+            Post.objects.bulk_update(batch, SUMMARY_FIELDS)
+            batch = []
+    Post.objects.bulk_update(batch, SUMMARY_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_trending'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
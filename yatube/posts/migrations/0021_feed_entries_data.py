@@ -0,0 +1,55 @@
+from itertools import groupby
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count
+
+
+def fill_feeds(apps, schema_editor):
+    """
+    Ленты подписчиков из уже существующих подписок — так же, как
+    ``feed.backfill`` при подписке; иначе ``/follow/`` оставалась бы
+    пустой, пока автор не опубликует новый пост. Популярные авторы
+    пропускаются: их посты подмешиваются при чтении.
+    """
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    FeedEntry = apps.get_model('posts', 'FeedEntry')
+    pull_authors = set(
+        Follow.objects.values('author_id').annotate(
+            followers=Count('id')
+        ).filter(
+            followers__gte=settings.FEED_FANOUT_LIMIT
+        ).values_list('author_id', flat=True)
+    )
+    follows = Follow.objects.order_by('author_id').values_list(
+        'author_id', 'user_id'
+    )
+    for author_id, pairs in groupby(follows.iterator(),
+                                    key=lambda pair: pair[0]):
+        if author_id in pull_authors:
+            continue
+        user_ids = [user_id for _, user_id in pairs]
+        posts = list(
+            Post.objects.filter(author_id=author_id)
+            .order_by('-pub_date', '-id')
+            .values_list('id', 'pub_date')[:settings.FEED_BACKFILL]
+        )
+        FeedEntry.objects.bulk_create(
+            [FeedEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+             for user_id in user_ids
+             for post_id, pub_date in posts],
+            batch_size=settings.FEED_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_post_summary_data'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_feeds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def fill_counters(apps, schema_editor):
+    """
+    Счетчики постов, комментариев, подписчиков и просмотров для уже
+    существующих данных: новые столбцы и строки ``UserStats`` начинаются
+    с нуля. Тот же пересчет, что и у ``recount_counters``.
+    """
+    from posts import counters
+
+    counters.reconcile()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_feed_entries_data'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,21 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.utils.text import Truncator
 
 
 User = get_user_model()
 
 
+class PostQuerySet(models.QuerySet):
+    def cards(self):
+        """
+        Все, что читает карточка поста в списках: полный текст не
+        нужен, карточка показывает ``excerpt``.
+        """
+        return self.select_related('author', 'group').defer('text')
+
+
 class Post(models.Model):
     text = models.TextField('Текст поста')
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
@@ -28,18 +38,118 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    image_thumbnail = models.CharField(
+        'Адрес миниатюры',
+        max_length=255,
+        blank=True,
+        editable=False,
+    )
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    title = models.CharField(
+        'Заголовок',
+        max_length=255,
+        blank=True,
+        editable=False,
+    )
+    excerpt = models.TextField(
+        'Начало текста',
+        blank=True,
+        editable=False,
+    )
+    word_count = models.PositiveIntegerField(
+        'Количество слов',
+        default=0,
+        editable=False,
+    )
+    views_count = models.PositiveIntegerField(
+        'Количество просмотров',
+        default=0,
+        editable=False,
+    )
+    trending_score = models.FloatField(
+        'Популярность',
+        default=0.0,
+        editable=False,
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_date_idx'
+            ),
+            models.Index(
+                fields=['-trending_score', '-id'],
+                name='post_trending_idx'
+            ),
+        ]
 
     def __str__(self):
+        if 'text' in self.get_deferred_fields():
+            return self.title[:settings.COUNT_CHAR_POST_STR]
         return self.text[:settings.COUNT_CHAR_POST_STR]
 
+    def summarize(self):
+        """Заголовок, начало текста и число слов — из ``text``."""
+        truncator = Truncator(self.text)
+        self.title = truncator.chars(settings.COUNT_CHAR_POST_TITLE)
+        self.excerpt = truncator.words(settings.COUNT_WORDS_POST,
+                                       truncate=' …')
+        self.word_count = len(self.text.split())
+
+    def save(self, *args, **kwargs):
+        if 'text' not in self.get_deferred_fields():
+            self.summarize()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'text' in update_fields:
+                kwargs['update_fields'] = {
+                    *update_fields, 'title', 'excerpt', 'word_count'
+                }
+        super().save(*args, **kwargs)
+
 
 class Group(models.Model):
     title = models.CharField('Название группы', max_length=200)
     slug = models.SlugField('Путь', unique=True)
     description = models.TextField('Описание группы')
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0,
+        editable=False,
+    )
+    views_count = models.PositiveIntegerField(
+        'Количество просмотров постов',
+        default=0,
+        editable=False,
+    )
+    trending_score = models.FloatField(
+        'Популярность',
+        default=0.0,
+        editable=False,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['-trending_score', '-id'],
+                name='group_trending_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.title
@@ -61,6 +171,15 @@ class Comment(models.Model):
     text = models.TextField('Текст комментария')
     created = models.DateTimeField('Дата публикации', auto_now_add=True)
 
+    class Meta:
+        ordering = ['created', 'id']
+        indexes = [
+            models.Index(
+                fields=['post', 'created', 'id'],
+                name='comment_post_created_idx'
+            ),
+        ]
+
 
 class Follow(models.Model):
     author = models.ForeignKey(
@@ -75,6 +194,7 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
         related_name='follower',
     )
+    created = models.DateTimeField('Дата подписки', auto_now_add=True)
 
     class Meta:
         constraints = [
@@ -87,3 +207,90 @@ class Follow(models.Model):
                 name='author_cannot_subscribe'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['user', 'author'],
+                name='follow_user_author_idx'
+            ),
+        ]
+
+
+class FeedEntry(models.Model):
+    """Запись персональной ленты подписчика (fan-out-on-write)."""
+    user = models.ForeignKey(
+        User,
+        verbose_name='Подписчик',
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+    )
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        ordering = ['-pub_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_feed_user_post'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='feed_user_date_idx'
+            ),
+        ]
+
+
+class SearchTerm(models.Model):
+    """Строка инвертированного индекса: основа слова и пост с ней."""
+    MAX_LENGTH: int = 64
+
+    term = models.CharField('Основа слова', max_length=MAX_LENGTH)
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        on_delete=models.CASCADE,
+        related_name='search_terms',
+    )
+    weight = models.PositiveIntegerField('Число вхождений', default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['term', 'post'],
+                name='unique_search_term_post'
+            ),
+        ]
+
+
+class UserStats(models.Model):
+    """Счетчики пользователя, которые иначе пришлось бы считать COUNT(*)."""
+    user = models.OneToOneField(
+        User,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    posts_count = models.PositiveIntegerField('Количество постов', default=0)
+    followers_count = models.PositiveIntegerField(
+        'Количество подписчиков',
+        default=0,
+    )
+    following_count = models.PositiveIntegerField(
+        'Количество подписок',
+        default=0,
+    )
+
+    @classmethod
+    def of(cls, user) -> 'UserStats':
+        """Счетчики пользователя; нулевые, если строки еще нет."""
+        user_id = getattr(user, 'pk', user)
+        return (cls.objects.filter(user_id=user_id).first()
+                or cls(user_id=user_id))
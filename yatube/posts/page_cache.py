@@ -0,0 +1,246 @@
+from functools import wraps
+from typing import Callable
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.paginator import Page
+from django.db import connection, transaction
+from django.http import HttpResponse
+from core import caching, db_router
+from .models import Group, Post
+from .utils import CursorPaginator, page_pagik
+
+User = get_user_model()
+
+AUTHOR_FIELDS = ['id', 'username', 'first_name', 'last_name']
+GROUP_FIELDS = ['id', 'title', 'slug']
+
+
+def main_feed() -> str:
+    return 'main'
+
+
+def group_feed(group_id: int) -> str:
+    return f'group:{group_id}'
+
+
+def profile_feed(author_id: int) -> str:
+    return f'profile:{author_id}'
+
+
+def subscriptions_feed(user_id: int) -> str:
+    return f'follow:{user_id}'
+
+
+def post_page(post_id: int) -> str:
+    return f'post:{post_id}'
+
+
+def names_feed() -> str:
+    """
+    Имена авторов и названия и адреса групп: они лежат в строках всех
+    лент, поэтому их версия входит в ключ каждой страницы.
+    """
+    return 'names'
+
+
+def post_feeds(post: Post) -> list[str]:
+    """Ленты и страница поста: все, что меняется вместе с ним."""
+    feeds = [main_feed(), profile_feed(post.author_id), post_page(post.id)]
+    if post.group_id:
+        feeds.append(group_feed(post.group_id))
+    return feeds
+
+
+def feed_version(feed: str) -> int:
+    return caching.version('feed_version', feed)
+
+
+def feed_count(feed: str, compute: Callable[[], int]) -> int:
+    """
+    Длина ленты из кеша — оценка для ``CursorPaginator(estimated=True)``.
+
+    С версией ленты не сбрасывается: точный COUNT(*) выполняется не
+    чаще раза в ``FEED_COUNT_CACHE`` секунд.
+    """
+    return caching.get_or_compute('feed_count', feed, compute=compute,
+                                  timeout=settings.FEED_COUNT_CACHE)
+
+
+def invalidate(*feeds: str):
+    """
+    Сбрасывает закешированные страницы лент.
+
+    Внутри транзакции версия сдвигается еще раз после коммита: иначе
+    страница, собранная параллельным запросом до коммита, осталась бы
+    в кеше под новой версией.
+    """
+    _bump(feeds)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _bump(feeds))
+
+
+def _bump(feeds):
+    for feed in set(feeds):
+        caching.bump('feed_version', feed)
+    if settings.DATABASE_REPLICAS:
+        caching.set_many('feed_bumped', {(feed,): True for feed in feeds},
+                         timeout=settings.REPLICA_PIN_SECONDS)
+
+
+def replica_lagging(*feeds: str) -> bool:
+    """
+    Запрос читал реплику, а ленты менялись меньше ``REPLICA_PIN_SECONDS``
+    назад: реплика могла еще не получить запись, и собранную страницу
+    нельзя класть в общий кеш под новой версией.
+    """
+    if not db_router.read_replica():
+        return False
+    return bool(caching.get_many('feed_bumped', [(feed,) for feed in feeds]))
+
+
+def page_position(request) -> str:
+    cursor = request.GET.get('cursor')
+    if cursor:
+        return f'c{cursor}'
+    number = request.GET.get('page', '1')
+    return f'p{number if number.isdigit() else 1}'
+
+
+def _loaded_fields(post_list) -> list:
+    """Поля поста, которые читает QuerySet ленты (без ``defer``)."""
+    names, defer = post_list.query.deferred_loading
+    fields = Post._meta.concrete_fields
+    if defer:
+        return [field for field in fields if field.name not in names]
+    return [field for field in fields
+            if field.name in names or field.primary_key]
+
+
+def _dump_post(post: Post, fields: list) -> tuple:
+    group = None
+    if post.group_id:
+        group = tuple(getattr(post.group, name) for name in GROUP_FIELDS)
+    return (
+        tuple(
+            field.get_prep_value(getattr(post, field.attname))
+            for field in fields
+        ),
+        tuple(getattr(post.author, name) for name in AUTHOR_FIELDS),
+        group,
+    )
+
+
+def _load_post(row: tuple, field_names: list[str]) -> Post:
+    values, author, group = row
+    post = Post.from_db(None, field_names, values)
+    post.author = User.from_db(None, AUTHOR_FIELDS, author)
+    if group:
+        post.group = Group.from_db(None, GROUP_FIELDS, group)
+    return post
+
+
+def feed_page(request, feed: str, post_list, count=None,
+              estimated=False) -> Page:
+    """
+    Страница ленты из кеша.
+
+    В кеш попадают только строки постов текущей страницы вместе с
+    данными автора и группы, а не весь QuerySet; отложенные поля
+    (``defer``) остаются отложенными и в кеше. Истекшую страницу
+    пересчитывает один запрос (см. ``caching.get_or_compute``);
+    переименование автора или группы сбрасывает все страницы
+    (``names_feed``);
+    страница с отстающей реплики не сохраняется (``replica_lagging``).
+    ``count`` и ``estimated`` — как у ``page_pagik``.
+    """
+    computed = []
+    fields = _loaded_fields(post_list)
+
+    def build():
+        page_obj = page_pagik(request, post_list, count,
+                              estimated=estimated)
+        computed.append(page_obj)
+        return {
+            'number': page_obj.number,
+            'count': page_obj.paginator.count,
+            'fields': [field.attname for field in fields],
+            'rows': [_dump_post(post, fields) for post in page_obj],
+            'next_cursor': page_obj.next_cursor,
+            'previous_cursor': page_obj.previous_cursor,
+        }
+
+    def cacheable() -> bool:
+        request._replica_lagging = replica_lagging(feed)
+        return not request._replica_lagging
+
+    cached = caching.get_or_compute(
+        'feed_page', feed, feed_version(feed),
+        feed_version(names_feed()), page_position(request),
+        compute=build, timeout=settings.TIME_CACHE, cacheable=cacheable,
+    )
+    if computed:
+        return computed[0]
+    paginator = CursorPaginator(post_list, settings.COUNT_POSTS)
+    paginator.count = cached['count']
+    page_obj = Page(
+        [_load_post(row, cached['fields']) for row in cached['rows']],
+        cached['number'],
+        paginator,
+    )
+    page_obj.next_cursor = cached['next_cursor']
+    page_obj.previous_cursor = cached['previous_cursor']
+    return page_obj
+
+
+def _anonymous(request) -> bool:
+    return (request.method in ('GET', 'HEAD')
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES)
+
+
+def _storable(request, response) -> bool:
+    """
+    Ответ одинаков для всех анонимов (без cookie и CSRF-токена) и не
+    собран с отстающей реплики.
+    """
+    return (response.status_code == 200
+            and not getattr(request, '_replica_lagging', False)
+            and not response.streaming
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_USED'))
+
+
+def anonymous_page(etag_func):
+    """
+    Готовый ответ для анонимов из кеша.
+
+    Ключ — ETag страницы (``etag_func``, как у ``condition``): в нем
+    версии лент, адрес, номер страницы и год, поэтому при изменении
+    постов ленты ответ перестает читаться сразу. Запросы с cookie
+    сессии всегда обрабатываются видом.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _anonymous(request):
+                return view(request, *args, **kwargs)
+            etag = etag_func(request, *args, **kwargs)
+            if etag is None:
+                return view(request, *args, **kwargs)
+            cached = caching.get('anonymous_page', etag)
+            if cached is not None:
+                response = HttpResponse(cached['content'],
+                                        status=cached['status'])
+                for header, value in cached['headers']:
+                    response[header] = value
+                return response
+            response = view(request, *args, **kwargs)
+            if _storable(request, response):
+                caching.set('anonymous_page', etag, value={
+                    'status': response.status_code,
+                    'content': response.content,
+                    'headers': list(response.items()),
+                }, timeout=settings.TIME_CACHE)
+            return response
+        return wrapper
+    return decorator
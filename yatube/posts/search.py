@@ -0,0 +1,231 @@
+import math
+import re
+from typing import Optional
+
+from django.conf import settings
+from django.db import OperationalError, connection
+from django.db.models import Count
+from .models import Post, SearchTerm
+
+FTS_TABLE = 'posts_post_fts'
+
+WORD_RE = re.compile(r'[0-9a-zа-я]+')
+VOWELS = 'аеиоуыэюя'
+STOP_WORDS = frozenset((
+    'а', 'без', 'бы', 'в', 'во', 'вот', 'да', 'для', 'до', 'е', 'его', 'ее',
+    'же', 'за', 'и', 'из', 'или', 'им', 'их', 'к', 'как', 'ли', 'мы', 'на',
+    'не', 'нет', 'ни', 'но', 'о', 'об', 'он', 'она', 'они', 'оно', 'от',
+    'по', 'при', 'с', 'со', 'так', 'то', 'ты', 'у', 'уже', 'что', 'это',
+    'я',
+))
+
+
+def _by_length(*suffixes: str) -> tuple:
+    return tuple(sorted(suffixes, key=len, reverse=True))
+
+
+# Окончания русского стеммера Snowball. Группы с флагом True
+# срабатывают только после «а» или «я».
+PERFECTIVE_GERUND = (
+    (_by_length('в', 'вши', 'вшись'), True),
+    (_by_length('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'), False),
+)
+REFLEXIVE = ((_by_length('ся', 'сь'), False),)
+ADJECTIVE = ((_by_length(
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+    'ая', 'яя', 'ою', 'ею',
+), False),)
+PARTICIPLE = (
+    (_by_length('ем', 'нн', 'вш', 'ющ', 'щ'), True),
+    (_by_length('ивш', 'ывш', 'ующ'), False),
+)
+VERB = (
+    (_by_length(
+        'ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но',
+        'ет', 'ют', 'ны', 'ть', 'ешь', 'нно',
+    ), True),
+    (_by_length(
+        'ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей',
+        'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят',
+        'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю',
+    ), False),
+)
+NOUN = ((_by_length(
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии',
+    'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам',
+    'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия',
+    'ья', 'я',
+), False),)
+SUPERLATIVE = ((_by_length('ейш', 'ейше'), False),)
+DERIVATIONAL = _by_length('ост', 'ость')
+
+
+def _strip(word: str, groups) -> Optional[str]:
+    """Отрезает самое длинное подходящее окончание или возвращает None."""
+    for suffixes, after_a in groups:
+        for suffix in suffixes:
+            if word.endswith(suffix):
+                head = word[:-len(suffix)]
+                if after_a and not head.endswith(('а', 'я')):
+                    break
+                return head
+    return None
+
+
+def _region(word: str, start: int = 0) -> int:
+    """Начало области после первой пары «гласная + согласная»."""
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _remove_ending(rv: str) -> str:
+    """Шаг 1: окончание деепричастия, прилагательного, глагола или имени."""
+    head = _strip(rv, PERFECTIVE_GERUND)
+    if head is not None:
+        return head
+    rv = _strip(rv, REFLEXIVE) or rv
+    head = _strip(rv, ADJECTIVE)
+    if head is not None:
+        return _strip(head, PARTICIPLE) or head
+    head = _strip(rv, VERB)
+    if head is None:
+        head = _strip(rv, NOUN)
+    return rv if head is None else head
+
+
+def _tidy(rv: str) -> str:
+    """Шаг 4: двойная «н», превосходная степень и мягкий знак."""
+    if rv.endswith('нн'):
+        return rv[:-1]
+    head = _strip(rv, SUPERLATIVE)
+    if head is not None:
+        return head[:-1] if head.endswith('нн') else head
+    return rv[:-1] if rv.endswith('ь') else rv
+
+
+def stem(word: str) -> str:
+    """Основа слова по русскому алгоритму Snowball (Портер)."""
+    word = word.replace('ё', 'е')
+    for i, letter in enumerate(word):
+        if letter in VOWELS:
+            break
+    else:
+        return word
+    prefix, rv = word[:i + 1], word[i + 1:]
+    r2 = _region(word, _region(word)) - len(prefix)
+
+    rv = _remove_ending(rv)
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    for suffix in DERIVATIONAL:
+        if rv.endswith(suffix) and len(rv) - len(suffix) >= r2:
+            rv = rv[:-len(suffix)]
+            break
+    return prefix + _tidy(rv)
+
+
+def tokenize(text: str) -> list[str]:
+    """Основы значимых слов текста в порядке появления."""
+    words = WORD_RE.findall(text.lower().replace('ё', 'е'))
+    return [
+        stem(word)[:SearchTerm.MAX_LENGTH]
+        for word in words if word not in STOP_WORDS
+    ]
+
+
+_fts_tables = {}
+
+
+def use_fts() -> bool:
+    """Индекс FTS5 доступен и не отключен настройкой SEARCH_BACKEND."""
+    if settings.SEARCH_BACKEND == 'python' or connection.vendor != 'sqlite':
+        return False
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if key not in _fts_tables:
+        _fts_tables[key] = (
+            FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_tables[key]
+
+
+def index_post(post: Post):
+    """Обновляет поисковый индекс для одного поста."""
+    terms = tokenize(post.text)
+    if use_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                           [post.id])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, stems) VALUES (%s, %s)',
+                [post.id, ' '.join(terms)]
+            )
+        return
+    SearchTerm.objects.filter(post_id=post.id).delete()
+    frequencies = {}
+    for term in terms:
+        frequencies[term] = frequencies.get(term, 0) + 1
+    SearchTerm.objects.bulk_create([
+        SearchTerm(term=term, post_id=post.id, weight=weight)
+        for term, weight in frequencies.items()
+    ])
+
+
+def unindex_post(post_id: int):
+    if use_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                           [post_id])
+
+
+def _search_fts(terms: list[str]) -> list[int]:
+    match = ' '.join('"{}"'.format(term) for term in terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY bm25({FTS_TABLE}) LIMIT %s',
+            [match, settings.SEARCH_MAX_RESULTS]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_table(terms: list[str]) -> list[int]:
+    total = Post.objects.count()
+    frequencies = dict(
+        SearchTerm.objects.filter(term__in=terms).values('term')
+        .annotate(count=Count('post')).values_list('term', 'count')
+    )
+    if len(frequencies) < len(terms):
+        return []
+    # tf-idf: редкие слова весят больше частых.
+    idf = {
+        term: math.log(1 + total / count)
+        for term, count in frequencies.items()
+    }
+    rows = SearchTerm.objects.filter(term__in=terms).values_list(
+        'post_id', 'term', 'weight'
+    ).order_by('post_id')
+    scores, found = {}, {}
+    for post_id, term, weight in rows.iterator():
+        scores[post_id] = scores.get(post_id, 0) + weight * idf[term]
+        found[post_id] = found.get(post_id, 0) + 1
+    results = [
+        post_id for post_id, count in found.items() if count == len(terms)
+    ]
+    results.sort(key=lambda post_id: (-scores[post_id], -post_id))
+    return results[:settings.SEARCH_MAX_RESULTS]
+
+
+def search(query: str) -> list[int]:
+    """id постов, содержащих все слова запроса, от лучших к худшим."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return []
+    if use_fts():
+        try:
+            return _search_fts(terms)
+        except OperationalError:
+            return []
+    return _search_table(terms)
@@ -0,0 +1,126 @@
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from . import counters, feed, page_cache, search, trending, view_counts
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+GROUP_NAMES = ('title', 'slug')
+USER_NAMES = ('username', 'first_name', 'last_name')
+"""Поля, которые ленты кешируют вместе со строками постов."""
+
+
+def _names(instance, fields) -> tuple:
+    return tuple(instance.__dict__.get(field) for field in fields)
+
+
+def _post_feeds(post: Post) -> list[str]:
+    """Ленты поста, включая группу, из которой его только что убрали."""
+    feeds = page_cache.post_feeds(post)
+    if post._loaded_group_id:
+        feeds.append(page_cache.group_feed(post._loaded_group_id))
+    return feeds
+
+
+@receiver(post_init, sender=Post)
+def post_loaded(sender, instance, **kwargs):
+    instance._loaded_group_id = instance.__dict__.get('group_id')
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.change_user(instance.author_id, posts_count=1)
+        counters.change_group(instance.group_id, 1)
+        feed.fan_out_post(instance)
+        trending.post_published(instance)
+    elif instance._loaded_group_id != instance.group_id:
+        views = instance.__dict__.get('views_count', 0)
+        counters.change_group(instance._loaded_group_id, -1, -views)
+        counters.change_group(instance.group_id, 1, views)
+    page_cache.invalidate(*_post_feeds(instance))
+    instance._loaded_group_id = instance.group_id
+    search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.change_user(instance.author_id, posts_count=-1)
+    counters.change_group(instance.group_id, -1,
+                          -instance.__dict__.get('views_count', 0))
+    search.unindex_post(instance.id)
+    page_cache.invalidate(*_post_feeds(instance))
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.change_user(instance.author_id, followers_count=1)
+        counters.change_user(instance.user_id, following_count=1)
+        feed.repair_on_follow(instance)
+        trending.author_followed(instance.author_id)
+        page_cache.invalidate(page_cache.profile_feed(instance.author_id),
+                              page_cache.profile_feed(instance.user_id))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.change_user(instance.author_id, followers_count=-1)
+    counters.change_user(instance.user_id, following_count=-1)
+    feed.repair_on_unfollow(instance)
+    page_cache.invalidate(page_cache.profile_feed(instance.author_id),
+                          page_cache.profile_feed(instance.user_id))
+
+
+@receiver(post_init, sender=Group)
+def group_loaded(sender, instance, **kwargs):
+    instance._loaded_names = _names(instance, GROUP_NAMES)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    names = _names(instance, GROUP_NAMES)
+    if not created:
+        feeds = [page_cache.group_feed(instance.id)]
+        if names != instance._loaded_names:
+            feeds.append(page_cache.names_feed())
+        page_cache.invalidate(*feeds)
+    instance._loaded_names = names
+
+
+@receiver(post_init, sender=User)
+def user_loaded(sender, instance, **kwargs):
+    instance._loaded_names = _names(instance, USER_NAMES)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    """Вход (``last_login``) и смена пароля кеш лент не трогают."""
+    names = _names(instance, USER_NAMES)
+    if not created and names != instance._loaded_names:
+        page_cache.invalidate(page_cache.profile_feed(instance.id),
+                              page_cache.names_feed())
+    instance._loaded_names = names
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    created = kwargs.get('created')
+    if created is not None and not created:
+        return
+    counters.change_post(instance.post_id, 1 if created else -1)
+    post = Post.objects.only('author_id', 'group_id').filter(
+        id=instance.post_id
+    ).first()
+    if post is not None:
+        if created:
+            trending.post_commented(post, instance.created)
+        page_cache.invalidate(*page_cache.post_feeds(post))
+
+
+@receiver(request_finished)
+def request_done(sender, **kwargs):
+    view_counts.flush_if_due()
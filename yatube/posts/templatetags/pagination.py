@@ -0,0 +1,11 @@
+from django import template
+from posts.utils import page_window as window
+
+
+register = template.Library()
+
+
+@register.filter
+def page_window(page_obj):
+    """Номера страниц вокруг текущей; ``None`` — пропуск."""
+    return window(page_obj.number, page_obj.paginator.num_pages)
@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import view_counts
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiTest(TestCase):
+    COUNT_POSTS: int = 15
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author',
+                                         first_name='Лев')
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        for i in range(cls.COUNT_POSTS):
+            Post.objects.create(text=f'Пост {i}', author=cls.author,
+                                group=cls.group if i % 2 else None)
+        cls.post = Post.objects.first()
+        Comment.objects.create(post=cls.post, author=cls.reader,
+                               text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        view_counts.buffer.take()
+        self.client = Client()
+
+    def get(self, name, *args, **params):
+        response = self.client.get(reverse(name, args=args), params)
+        return response.status_code, response.json()
+
+    def test_cursor_pages_cover_feed(self):
+        status, data = self.get('posts:api_posts', limit=4)
+        self.assertEqual(status, 200)
+        self.assertEqual(data['count'], self.COUNT_POSTS)
+        texts = [row['text'] for row in data['results']]
+        while data['next']:
+            status, data = self.get('posts:api_posts', limit=4,
+                                    cursor=data['next'])
+            texts += [row['text'] for row in data['results']]
+        self.assertEqual(
+            texts, [f'Пост {i}' for i in reversed(range(self.COUNT_POSTS))]
+        )
+
+    def test_stale_count_keeps_all_pages(self):
+        """Длина из кеша — оценка: по курсорам видны и новые посты."""
+        self.get('posts:api_posts', limit=4)
+        Post.objects.create(text='Новый', author=self.author)
+        _, data = self.get('posts:api_posts', limit=4)
+        seen = len(data['results'])
+        while data['next']:
+            _, data = self.get('posts:api_posts', limit=4,
+                               cursor=data['next'])
+            seen += len(data['results'])
+        self.assertEqual(seen, self.COUNT_POSTS + 1)
+        self.assertEqual(data['count'], self.COUNT_POSTS + 1)
+
+    def test_field_selection(self):
+        _, data = self.get('posts:api_posts', fields='id,author')
+        self.assertEqual(set(data['results'][0]), {'id', 'author'})
+        self.assertEqual(data['results'][0]['author']['first_name'], 'Лев')
+        status, data = self.get('posts:api_posts', fields='id,password')
+        self.assertEqual(status, 400)
+        self.assertIn('password', data['error'])
+
+    def test_relations_batched(self):
+        """
+        Авторы и группы страницы — по одному запросу на связь; длина
+        ленты — из кеша, без COUNT(*).
+        """
+        self.get('posts:api_posts', limit=2)
+        for limit in (2, 10):
+            with self.subTest(limit=limit):
+                with self.assertNumQueries(3):
+                    _, data = self.get('posts:api_posts', limit=limit)
+                self.assertEqual(len(data['results']), limit)
+
+    def test_post_detail(self):
+        status, data = self.get('posts:api_post_detail', self.post.id,
+                                fields='text')
+        self.assertEqual(status, 200)
+        self.assertEqual(data['text'], self.post.text)
+        self.assertEqual(data['comments']['count'], 1)
+        self.assertEqual(
+            data['comments']['results'][0]['author']['username'], 'reader'
+        )
+        status, data = self.get('posts:api_post_detail', 999)
+        self.assertEqual(status, 404)
+
+    def test_group_and_profile(self):
+        _, data = self.get('posts:api_group', self.group.slug)
+        self.assertEqual(data['group']['posts_count'], 7)
+        self.assertEqual(data['posts']['count'], 7)
+        _, data = self.get('posts:api_profile', self.author.username)
+        self.assertEqual(data['profile']['followers_count'], 1)
+        self.assertEqual(data['posts']['count'], self.COUNT_POSTS)
+
+    def test_follow_requires_login(self):
+        status, _ = self.get('posts:api_follow')
+        self.assertEqual(status, 401)
+        self.client.force_login(self.reader)
+        status, data = self.get('posts:api_follow', fields='id')
+        self.assertEqual(status, 200)
+        self.assertEqual(len(data['results']), 10)
+
+    def test_bad_cursor(self):
+        status, _ = self.get('posts:api_posts', cursor='broken')
+        self.assertEqual(status, 400)
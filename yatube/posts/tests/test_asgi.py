@@ -0,0 +1,162 @@
+import asyncio
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import TransactionTestCase
+
+from core.asgi import WsgiToAsgi
+from posts import benchmark
+from posts.models import Post
+
+User = get_user_model()
+
+
+class AsgiAdapterTest(TransactionTestCase):
+    """Виды выполняются в потоках пула, поэтому без общей транзакции."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='author')
+        self.post = Post.objects.create(text='Пост через ASGI',
+                                        author=self.user)
+        self.application = WsgiToAsgi(WSGIHandler(), 2)
+
+    def tearDown(self):
+        self.application.executor.shutdown()
+
+    def request(self, path, application=None):
+        scope = {
+            'type': 'http',
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'query_string': b'',
+            'headers': [(b'host', b'testserver')],
+            'server': ('testserver', 80),
+            'client': ('127.0.0.1', 0),
+        }
+        sent = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run((application or self.application)(scope, receive, send))
+        return sent
+
+    def test_get(self):
+        start, body = self.request('/')
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/html; charset=utf-8'),
+                      start['headers'])
+        self.assertIn('Пост через ASGI', body['body'].decode())
+
+    def test_unicode_path_and_redirect(self):
+        start, _ = self.request('/profile/нет/')
+        self.assertEqual(start['status'], 404)
+        start, _ = self.request('/follow/')
+        self.assertEqual(start['status'], 302)
+
+    def test_environ(self):
+        """Тело запроса собирается из частей, заголовки — как в WSGI."""
+        chunks = [b'a=1&', b'b=2']
+
+        async def receive():
+            chunk = chunks.pop(0)
+            return {'type': 'http.request', 'body': chunk,
+                    'more_body': bool(chunks)}
+
+        body = asyncio.run(WsgiToAsgi.read_body(receive))
+        environ = WsgiToAsgi.environ({
+            'method': 'POST',
+            'path': '/поиск/',
+            'query_string': b'q=1',
+            'headers': [(b'content-type', b'text/plain'),
+                        (b'x-tag', b'a'), (b'x-tag', b'b'),
+                        (b'cookie', b'a=1'), (b'cookie', b'b=2')],
+        }, body)
+        self.assertEqual(environ['wsgi.input'].read(), b'a=1&b=2')
+        self.assertEqual(environ['CONTENT_TYPE'], 'text/plain')
+        self.assertEqual(environ['HTTP_X_TAG'], 'a,b')
+        self.assertEqual(environ['HTTP_COOKIE'], 'a=1; b=2')
+        self.assertEqual(environ['QUERY_STRING'], 'q=1')
+        self.assertEqual(
+            environ['PATH_INFO'].encode('latin-1').decode(), '/поиск/'
+        )
+
+    def test_streaming_and_repeated_headers(self):
+        """Части тела уходят по одной, Set-Cookie — отдельными парами."""
+        def application(environ, start_response):
+            start_response('200 OK', [('Set-Cookie', 'a=1'),
+                                      ('Set-Cookie', 'b=2')])
+            return iter([b'first', b'', b'second'])
+
+        adapter = WsgiToAsgi(application, 1)
+        try:
+            start, *body = self.request('/', adapter)
+        finally:
+            adapter.executor.shutdown()
+        self.assertEqual(start['headers'], [(b'set-cookie', b'a=1'),
+                                            (b'set-cookie', b'b=2')])
+        self.assertEqual(
+            [(part['body'], part.get('more_body', False)) for part in body],
+            [(b'first', True), (b'second', False)],
+        )
+
+    def test_client_gone_closes_response(self):
+        closed = []
+
+        class Result:
+            def __iter__(self):
+                return iter([b'part'] * 100)
+
+            def close(self):
+                closed.append(True)
+
+        def application(environ, start_response):
+            start_response('200 OK', [])
+            return Result()
+
+        async def send(message):
+            if message['type'] == 'http.response.body':
+                raise ConnectionResetError
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        adapter = WsgiToAsgi(application, 1)
+        scope = {'type': 'http', 'method': 'GET', 'path': '/'}
+        try:
+            with self.assertRaises(ConnectionResetError):
+                asyncio.run(adapter(scope, receive, send))
+        finally:
+            adapter.executor.shutdown()
+        self.assertEqual(closed, [True])
+
+    def test_lifespan(self):
+        messages = [{'type': 'lifespan.startup'},
+                    {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        asyncio.run(self.application({'type': 'lifespan'}, receive, send))
+        self.assertEqual(sent, ['lifespan.startup.complete',
+                                'lifespan.shutdown.complete'])
+
+    def test_concurrency_benchmark(self):
+        benchmark.seed(users=4, groups=2, posts=20, comments=10, follows=4)
+        results = benchmark.concurrency(clients=10, threads=2,
+                                        db_delay=0, client_delay=0,
+                                        rounds=1)
+        self.assertEqual(set(results), {'wsgi', 'asgi'})
+        for metrics in results.values():
+            self.assertEqual(metrics['statuses'], [200])
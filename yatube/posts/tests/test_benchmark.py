@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from posts import benchmark
+from posts.models import Post
+from posts.urls import urlpatterns
+
+User = get_user_model()
+
+
+class BenchmarkCommandTest(TestCase):
+    def setUp(self):
+        handle, self.output = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.output)
+
+    def run_benchmark(self, **options):
+        call_command(
+            'benchmark_views', current_db=True, users=5, groups=2, posts=30,
+            comments=20, follows=5, iterations=2, warmup=0,
+            stdout=StringIO(), **options
+        )
+
+    def test_every_url_measured(self):
+        """Каждый маршрут posts.urls попадает в отчет."""
+        self.run_benchmark(output=self.output)
+        with open(self.output) as file:
+            results = json.load(file)
+        self.assertEqual(
+            set(results),
+            {f'posts:{pattern.name}' for pattern in urlpatterns}
+        )
+        for name, metrics in results.items():
+            with self.subTest(name=name):
+                self.assertLess(max(metrics['statuses']), 400)
+                self.assertGreater(metrics['queries'], 0)
+
+    def test_current_db_left_clean(self):
+        """С ``--current-db`` данные прогона откатываются."""
+        self.run_benchmark()
+        self.assertFalse(
+            User.objects.filter(username__startswith='bench_').exists()
+        )
+        self.assertFalse(Post.objects.exists())
+
+    def test_regression_fails_run(self):
+        """Рост числа запросов против базовой линии — ошибка."""
+        baseline = {'posts:main': {'queries': 0, 'p90_ms': 10 ** 6}}
+        with open(self.output, 'w') as file:
+            json.dump(baseline, file)
+        with self.assertRaisesMessage(CommandError, 'posts:main'):
+            self.run_benchmark(baseline=self.output)
+
+    def test_compare_latency(self):
+        results = {'posts:main': {'queries': 2, 'p90_ms': 13.0}}
+        baseline = {'posts:main': {'queries': 2, 'p90_ms': 10.0}}
+        self.assertEqual(benchmark.compare(results, baseline, 0.5), [])
+        self.assertEqual(len(benchmark.compare(results, baseline, 0.2)), 1)
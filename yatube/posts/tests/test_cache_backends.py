@@ -0,0 +1,252 @@
+import socketserver
+import threading
+import time
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from core.cache_backends import RespCache, RespConnection, TieredCache
+
+
+class FakeRespHandler(socketserver.StreamRequestHandler):
+    """Небольшое подмножество команд Redis поверх словаря."""
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            self.server.commands.append(args[0].decode())
+            reply = getattr(self, 'cmd_' + args[0].decode().lower())(
+                *args[1:]
+            )
+            self.wfile.write(reply)
+
+    def alive(self, key):
+        value, expires = self.server.data.get(key, (None, None))
+        if expires is not None and expires < time.monotonic():
+            del self.server.data[key]
+            return None
+        return value
+
+    @staticmethod
+    def bulk(value):
+        if value is None:
+            return b'$-1\r\n'
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+
+    def cmd_get(self, key):
+        return self.bulk(self.alive(key))
+
+    def cmd_mget(self, *keys):
+        return b'*%d\r\n' % len(keys) + b''.join(
+            self.bulk(self.alive(key)) for key in keys
+        )
+
+    def cmd_set(self, key, value, *flags):
+        flags = [flag.upper() for flag in flags]
+        if b'NX' in flags and self.alive(key) is not None:
+            return b'$-1\r\n'
+        expires = None
+        if b'PX' in flags:
+            ttl = int(flags[flags.index(b'PX') + 1])
+            expires = time.monotonic() + ttl / 1000
+        self.server.data[key] = (value, expires)
+        return b'+OK\r\n'
+
+    def cmd_del(self, *keys):
+        return b':%d\r\n' % sum(
+            self.server.data.pop(key, None) is not None for key in keys
+        )
+
+    def cmd_exists(self, key):
+        return b':%d\r\n' % (self.alive(key) is not None)
+
+    def cmd_incrby(self, key, delta):
+        value = self.alive(key) or b'0'
+        if not value.lstrip(b'-').isdigit():
+            return b'-ERR value is not an integer\r\n'
+        value = int(value) + int(delta)
+        self.server.data[key] = (str(value).encode(),
+                                 self.server.data[key][1])
+        return b':%d\r\n' % value
+
+    def cmd_eval(self, script, numkeys, key, delta):
+        if self.alive(key) is None:
+            return b'$-1\r\n'
+        return self.cmd_incrby(key, delta)
+
+    def cmd_pexpire(self, key, ttl):
+        if self.alive(key) is None:
+            return b':0\r\n'
+        self.server.data[key] = (self.server.data[key][0],
+                                 time.monotonic() + int(ttl) / 1000)
+        return b':1\r\n'
+
+    def cmd_flushdb(self):
+        self.server.data.clear()
+        return b'+OK\r\n'
+
+    def cmd_select(self, db):
+        return b'+OK\r\n'
+
+
+class FakeRespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeRespHandler)
+        self.data = {}
+        self.commands = []
+
+
+class RespCacheTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeRespServer()
+        threading.Thread(target=cls.server.serve_forever,
+                         daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        host, port = self.server.server_address
+        self.cache = RespCache(f'{host}:{port}', {'OPTIONS': {'DB': 1}})
+        self.cache.clear()
+
+    def test_values(self):
+        self.cache.set('page', {'rows': [1, 2]})
+        self.assertEqual(self.cache.get('page'), {'rows': [1, 2]})
+        self.assertIsNone(self.cache.get('missing'))
+        self.assertEqual(self.cache.get('missing', 'default'), 'default')
+        self.cache.delete('page')
+        self.assertFalse(self.cache.has_key('page'))
+
+    def test_add_and_incr(self):
+        self.assertTrue(self.cache.add('version', 10))
+        self.assertFalse(self.cache.add('version', 20))
+        self.server.commands.clear()
+        self.assertEqual(self.cache.incr('version'), 11)
+        self.assertEqual(self.server.commands, ['EVAL'])
+        self.assertEqual(self.cache.get('version'), 11)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+        self.cache.set('text', 'abc')
+        with self.assertRaises(ValueError):
+            self.cache.incr('text')
+
+    def test_many_in_one_round_trip(self):
+        self.cache.set_many({'a': 1, 'b': 'два'})
+        self.server.commands.clear()
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']),
+                         {'a': 1, 'b': 'два'})
+        self.assertEqual(self.server.commands, ['MGET'])
+
+    def test_timeout(self):
+        self.cache.set('short', 1, 0.05)
+        self.cache.set('gone', 1, 0)
+        self.assertFalse(self.cache.has_key('gone'))
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get('short'))
+
+    def test_reconnects(self):
+        self.cache.set('key', 1)
+        self.cache._local.connection.sock.close()
+        self.assertEqual(self.cache.get('key'), 1)
+
+    def test_encode(self):
+        self.assertEqual(RespConnection.encode('GET', 'ключ'),
+                         '*2\r\n$3\r\nGET\r\n$8\r\nключ\r\n'.encode())
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'core.cache_backends.TieredCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {'LOCAL_PREFIXES': ['page:'], 'MAX_ENTRIES': 2,
+                    'RETRY_AFTER': 60},
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tiered-test',
+    },
+})
+class TieredCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.cache = caches['default']
+        self.shared = caches['shared']
+        self.assertIsInstance(self.cache, TieredCache)
+        self.cache.clear()
+
+    def test_local_tier_only_for_listed_prefixes(self):
+        self.cache.set('page:1', 'страница')
+        self.cache.set('version', 1)
+        self.shared.clear()
+        self.assertEqual(self.cache.get('page:1'), 'страница')
+        self.assertIsNone(self.cache.get('version'))
+
+    def test_shared_values_fill_local_tier(self):
+        self.shared.set('page:2', 'из общего')
+        self.assertEqual(self.cache.get_many(['page:2', 'other']),
+                         {'page:2': 'из общего'})
+        self.shared.clear()
+        self.assertEqual(self.cache.get('page:2'), 'из общего')
+
+    def test_lru_limit(self):
+        for number in range(3):
+            self.cache.set(f'page:{number}', number)
+        self.shared.clear()
+        self.assertIsNone(self.cache.get('page:0'))
+        self.assertEqual(self.cache.get('page:2'), 2)
+
+    def test_shared_outage(self):
+        """Без общего кеша — промахи, локальные ключи продолжают читаться."""
+        self.cache.set('page:1', 'страница')
+
+        def broken(*args, **kwargs):
+            raise ConnectionRefusedError
+
+        self.shared.get = broken
+        self.shared.set = broken
+        try:
+            self.assertIsNone(self.cache.get('version'))
+            self.cache.set('version', 1)
+            self.assertEqual(self.cache.get('page:1'), 'страница')
+            with self.assertRaises(ValueError):
+                self.cache.incr('version')
+        finally:
+            del self.shared.get, self.shared.set
+            self.cache._down_until = 0
+
+    def test_failed_incr_replayed(self):
+        """Сдвиг версии во время сбоя не теряется."""
+        self.shared.set('version', 1)
+
+        def broken(*args, **kwargs):
+            raise ConnectionRefusedError
+
+        self.shared.incr = broken
+        try:
+            with self.assertRaises(ValueError):
+                self.cache.incr('version', 2)
+        finally:
+            del self.shared.incr
+            self.cache._down_until = 0
+        self.assertEqual(self.cache.get('version'), 3)
+        self.assertEqual(self.cache.incr('version'), 4)
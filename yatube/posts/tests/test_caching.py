@@ -0,0 +1,71 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from core import caching
+
+
+class GetOrComputeTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self, value='новое', pause=0.0):
+        def compute():
+            self.calls += 1
+            time.sleep(pause)
+            return value
+        return compute
+
+    def test_single_flight(self):
+        """Одновременные промахи пересчитывают значение один раз."""
+        results = []
+        start = threading.Barrier(20)
+
+        def worker():
+            start.wait()
+            results.append(caching.get_or_compute(
+                'test', 'key', compute=self.compute(pause=0.2), timeout=60,
+            ))
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ['новое'] * 20)
+
+    def test_stale_while_revalidate(self):
+        """Пока другой запрос пересчитывает, отдается старое значение."""
+        caching.get_or_compute('test', 'key', compute=self.compute('старое'),
+                               timeout=60)
+        with mock.patch.object(caching.time, 'time',
+                               return_value=time.time() + 61):
+            cache.add(caching.make_key('lease', 'test', 'key'), 1)
+            value = caching.get_or_compute(
+                'test', 'key', compute=self.compute(), timeout=60
+            )
+            self.assertEqual(value, 'старое')
+            cache.delete(caching.make_key('lease', 'test', 'key'))
+            value = caching.get_or_compute(
+                'test', 'key', compute=self.compute(), timeout=60
+            )
+        self.assertEqual(value, 'новое')
+        self.assertEqual(self.calls, 2)
+
+    def test_early_expiry(self):
+        """Долгий пересчет начинается до срока с ростом вероятности."""
+        envelope = {'value': 1, 'expires': time.time() + 10, 'delta': 1.0}
+        with mock.patch.object(caching.random, 'random', return_value=0.5):
+            self.assertTrue(caching._fresh(envelope))
+        with mock.patch.object(caching.random, 'random',
+                               return_value=0.99999999):
+            self.assertFalse(caching._fresh(envelope))
+        envelope['delta'] = 0.0
+        with mock.patch.object(caching.random, 'random',
+                               return_value=0.99999999):
+            self.assertTrue(caching._fresh(envelope))
@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import cards
+from posts.models import Group, Post
+
+User = get_user_model()
+
+CARD = 'posts/includes/post_card.html'
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='author', first_name='Лев')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        for i in range(3):
+            Post.objects.create(text=f'Пост {i}', author=cls.user,
+                                group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def posts(self):
+        return list(Post.objects.cards())
+
+    def test_cards_are_reused(self):
+        """Второй вывод страницы не рисует карточки заново."""
+        first = cards.render_cards(self.posts(), CARD)
+        with mock.patch.object(cards, 'render_to_string') as render:
+            second = cards.render_cards(self.posts(), CARD)
+        render.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertIn('Пост 0', first[2])
+
+    def test_version_follows_content(self):
+        """Правка поста, имени автора или группы меняет карточку."""
+        cards.render_cards(self.posts(), CARD)
+        post = Post.objects.first()
+        post.text = 'Новый текст'
+        post.save()
+        User.objects.filter(id=self.user.id).update(first_name='Федор')
+        Group.objects.filter(id=self.group.id).update(slug='other')
+        html = cards.render_cards(self.posts(), CARD)
+        self.assertIn('Новый текст', html[0])
+        self.assertIn('Федор', html[1])
+        self.assertIn(reverse('posts:group_list', args=['other']), html[2])
+
+    def test_variant_in_key(self):
+        """Карточки разных шаблонов кешируются отдельно."""
+        cards.render_cards(self.posts(), CARD)
+        html = cards.render_cards(self.posts(),
+                                  'posts/includes/post_card_group.html')
+        self.assertNotIn('Все записи группы', html[0])
+
+    def test_page_uses_one_cache_read(self):
+        client = Client()
+        client.force_login(self.user)
+        client.get(reverse('posts:main'))
+        with mock.patch.object(cache, 'get_many',
+                               wraps=cache.get_many) as get_many:
+            response = client.get(reverse('posts:main'))
+        get_many.assert_called_once()
+        self.assertContains(response, 'Пост 1')
@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Post
+from posts.utils import CursorPaginator
+
+User = get_user_model()
+
+
+@override_settings(COUNT_COMMENTS=4)
+class CommentPagesTest(TestCase):
+    COUNT_COMMENTS: int = 10
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='author')
+        cls.post = Post.objects.create(text='Пост', author=cls.user)
+        for i in range(cls.COUNT_COMMENTS):
+            Comment.objects.create(post=cls.post, author=cls.user,
+                                   text=f'Комментарий {i}')
+        cls.post.refresh_from_db()
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def texts(self, page) -> list[str]:
+        return [comment.text for comment in page]
+
+    def test_first_page_is_bounded(self):
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.id])
+        )
+        page = response.context['comments_page']
+        self.assertEqual(self.texts(page),
+                         [f'Комментарий {i}' for i in range(4)])
+        self.assertEqual(page.paginator.count, self.COUNT_COMMENTS)
+        self.assertContains(response, page.next_cursor)
+
+    def test_detail_loads_more_comments(self):
+        """Страница поста подгружает следующие комментарии фрагментом."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.id])
+        )
+        cursor = response.context['comments_page'].next_cursor
+        url = reverse('posts:post_comments', args=[self.post.id])
+        self.assertContains(response, f'data-more="{url}?cursor={cursor}"')
+        self.assertContains(response, "closest('a[data-more]')")
+
+    def test_partial_walks_all_comments(self):
+        url = reverse('posts:post_comments', args=[self.post.id])
+        response = self.client.get(url)
+        texts = self.texts(response.context['comments_page'])
+        while response.context['comments_page'].next_cursor:
+            cursor = response.context['comments_page'].next_cursor
+            response = self.client.get(url, {'cursor': cursor})
+            self.assertTemplateNotUsed(response, 'base.html')
+            self.assertNotContains(response, 'Предыдущие комментарии')
+            page = response.context['comments_page']
+            if page.next_cursor:
+                self.assertContains(
+                    response, f'href="{url}?cursor={page.next_cursor}"'
+                )
+            texts += self.texts(page)
+        self.assertEqual(
+            texts, [f'Комментарий {i}' for i in range(self.COUNT_COMMENTS)]
+        )
+
+    def test_count_from_counter(self):
+        """Число комментариев не пересчитывается COUNT(*)."""
+        paginator = CursorPaginator(
+            self.post.comments.all(), 4,
+            count=lambda: self.post.comments_count,
+        )
+        with self.assertNumQueries(1):
+            page = paginator.page(1)
+            self.assertEqual(paginator.count, self.COUNT_COMMENTS)
+            self.assertEqual(len(page), 4)
+
+    def test_ascending_previous_cursor(self):
+        paginator = CursorPaginator(self.post.comments.all(), 4)
+        second = paginator.cursor_page(paginator.page(1).next_cursor)
+        first = paginator.cursor_page(second.previous_cursor)
+        self.assertEqual(first.number, 1)
+        self.assertEqual(self.texts(first),
+                         [f'Комментарий {i}' for i in range(4)])
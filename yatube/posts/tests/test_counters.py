@@ -0,0 +1,134 @@
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, UserStats
+
+User = get_user_model()
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.other_group = Group.objects.create(title='Другая', slug='other',
+                                               description='Описание')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def assertCounters(self, post=None):
+        self.group.refresh_from_db()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, self.group.posts.count())
+        self.assertEqual(self.other_group.posts_count,
+                         self.other_group.posts.count())
+        self.assertEqual(UserStats.of(self.author).posts_count,
+                         self.author.posts.count())
+        if post is not None:
+            post.refresh_from_db()
+            self.assertEqual(post.comments_count, post.comments.count())
+
+    def test_post_counters(self):
+        """Создание, перенос и удаление поста меняют счетчики."""
+        self.client.post(reverse('posts:post_create'),
+                         data={'text': 'Пост', 'group': self.group.id})
+        self.assertCounters()
+        post = Post.objects.get()
+        self.client.post(reverse('posts:post_edit', args=(post.id,)),
+                         data={'text': 'Пост', 'group': self.other_group.id})
+        self.assertCounters()
+        self.client.get(reverse('posts:post_delete', args=(post.id,)))
+        self.assertCounters()
+
+    def test_comment_counter(self):
+        """Комментарии считаются в посте."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        self.client.post(reverse('posts:add_comment', args=(post.id,)),
+                         data={'text': 'Комментарий'})
+        self.assertCounters(post)
+        Comment.objects.get().delete()
+        self.assertCounters(post)
+
+    def test_follow_counters(self):
+        """Подписка меняет счетчики подписчиков и подписок."""
+        client = Client()
+        client.force_login(self.reader)
+        client.get(reverse('posts:profile_follow',
+                           args=(self.author.username,)))
+        self.assertEqual(UserStats.of(self.author).followers_count, 1)
+        self.assertEqual(UserStats.of(self.reader).following_count, 1)
+        client.get(reverse('posts:profile_unfollow',
+                           args=(self.author.username,)))
+        self.assertEqual(UserStats.of(self.author).followers_count, 0)
+        self.assertEqual(UserStats.of(self.reader).following_count, 0)
+
+    def test_recount_counters(self):
+        """Команда recount_counters исправляет расхождения."""
+        post = Post.objects.create(text='Пост', author=self.author,
+                                   group=self.group)
+        Comment.objects.create(post=post, author=self.reader, text='Текст')
+        Follow.objects.create(author=self.author, user=self.reader)
+        Group.objects.update(posts_count=7)
+        Post.objects.update(comments_count=0)
+        UserStats.objects.all().delete()
+
+        out = StringIO()
+        call_command('recount_counters', stdout=out)
+
+        self.assertIn('group.posts_count: исправлено 2', out.getvalue())
+        self.assertCounters(post)
+        self.assertEqual(UserStats.of(self.author).followers_count, 1)
+        self.assertEqual(UserStats.of(self.reader).following_count, 1)
+
+    def test_migration_fills_counters(self):
+        migration = import_module('posts.migrations.0022_counters_data')
+        post = Post.objects.create(text='Пост', author=self.author,
+                                   group=self.group)
+        Comment.objects.create(post=post, author=self.reader, text='Текст')
+        Group.objects.update(posts_count=0)
+        Post.objects.update(comments_count=0)
+        UserStats.objects.all().delete()
+        migration.fill_counters(apps, None)
+        self.assertCounters(post)
+
+    @override_settings(COUNT_POSTS=2, COUNT_COMMENTS=2)
+    def test_low_counter_hides_nothing(self):
+        """Заниженный счетчик — оценка: страницы показывают все строки."""
+        for i in range(5):
+            post = Post.objects.create(text=f'Пост {i}', author=self.author,
+                                       group=self.group)
+            Comment.objects.create(post=post, author=self.reader,
+                                   text=f'Комментарий {i}')
+        Comment.objects.create(post=post, author=self.reader,
+                               text='Еще комментарий')
+        Comment.objects.create(post=post, author=self.reader,
+                               text='Последний комментарий')
+        Group.objects.update(posts_count=0)
+        UserStats.objects.update(posts_count=0)
+        Post.objects.update(comments_count=0)
+        cache.clear()
+        urls = [reverse('posts:group_list', args=[self.group.slug]),
+                reverse('posts:profile', args=[self.author.username])]
+        for url in urls:
+            with self.subTest(url=url):
+                page = self.client.get(url).context['page_obj']
+                self.assertEqual(len(page), 2)
+                self.assertTrue(page.has_next())
+                page = self.client.get(url, {'page': 3}).context['page_obj']
+                self.assertEqual(page.number, 3)
+                self.assertEqual([post.text for post in page], ['Пост 0'])
+        response = self.client.get(reverse('posts:post_detail',
+                                           args=[post.id]))
+        self.assertTrue(response.context['comments_page'].has_next())
@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import view_counts
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.post = Post.objects.create(text='Пост', author=cls.author,
+                                       group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        view_counts.buffer.take()
+        self.client = Client()
+        self.urls = {
+            'main': reverse('posts:main'),
+            'group': reverse('posts:group_list', args=[self.group.slug]),
+            'profile': reverse('posts:profile',
+                               args=[self.author.username]),
+            'detail': reverse('posts:post_detail', args=[self.post.id]),
+        }
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def assertNotModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def assertModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_unchanged_pages_not_modified(self):
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                self.assertNotModified(url, self.etag(url))
+
+    def test_validator_without_render(self):
+        """304 для ленты отдается без запросов на построение страницы."""
+        etag = self.etag(self.urls['main'])
+        with self.assertNumQueries(0):
+            self.assertNotModified(self.urls['main'], etag)
+
+    def test_new_post_changes_feeds(self):
+        etags = {name: self.etag(url) for name, url in self.urls.items()}
+        client = Client()
+        client.force_login(self.author)
+        client.post(reverse('posts:post_create'),
+                    {'text': 'Новый', 'group': self.group.id})
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                self.assertModified(url, etags[name])
+
+    def test_comment_and_follow(self):
+        detail = self.etag(self.urls['detail'])
+        profile = self.etag(self.urls['profile'])
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text='Комментарий')
+        self.assertModified(self.urls['detail'], detail)
+        self.assertModified(self.urls['profile'], profile)
+        profile = self.etag(self.urls['profile'])
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertModified(self.urls['profile'], profile)
+
+    def test_etag_depends_on_viewer(self):
+        etag = self.etag(self.urls['main'])
+        self.client.force_login(self.reader)
+        self.assertModified(self.urls['main'], etag)
+
+    def test_group_edit(self):
+        etag = self.etag(self.urls['group'])
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertModified(self.urls['group'], etag)
+
+    def test_missing_objects(self):
+        self.assertEqual(
+            self.client.get(reverse('posts:post_detail', args=[999]),
+                            HTTP_IF_NONE_MATCH='*').status_code,
+            404,
+        )
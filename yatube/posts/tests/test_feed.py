@@ -0,0 +1,80 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.feed import follow_feed
+from posts.models import FeedEntry, Follow, Post
+
+User = get_user_model()
+
+
+class FollowFeedTest(TestCase):
+    COUNT_POSTS_AUTHOR: int = 3
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.follower = User.objects.create(username='follower')
+        for i in range(cls.COUNT_POSTS_AUTHOR):
+            Post.objects.create(text=f'Пост {i}', author=cls.author)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.follower)
+
+    def test_follow_backfills_feed(self):
+        """Подписка добавляет в ленту уже опубликованные посты автора."""
+        self.client.post(reverse('posts:profile_follow',
+                                 args=(self.author.username,)))
+        self.assertEqual(
+            FeedEntry.objects.filter(user=self.follower).count(),
+            self.COUNT_POSTS_AUTHOR
+        )
+
+    def test_new_post_fans_out(self):
+        """Новый пост попадает в ленты подписчиков."""
+        Follow.objects.create(author=self.author, user=self.follower)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        entry = FeedEntry.objects.get(user=self.follower, post=post)
+        self.assertEqual(entry.pub_date, post.pub_date)
+        self.assertEqual(list(follow_feed(self.follower))[0], post)
+
+    def test_unfollow_clears_feed(self):
+        """Отписка убирает посты автора из ленты."""
+        Follow.objects.create(author=self.author, user=self.follower)
+        self.client.post(reverse('posts:profile_unfollow',
+                                 args=(self.author.username,)))
+        self.assertFalse(
+            FeedEntry.objects.filter(user=self.follower).exists()
+        )
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_popular_author_read_on_demand(self):
+        """Посты популярного автора не рассылаются, а читаются из ленты."""
+        Follow.objects.create(author=self.author, user=self.follower)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertFalse(FeedEntry.objects.exists())
+        self.assertEqual(
+            list(follow_feed(self.follower)),
+            list(self.author.posts.order_by('-pub_date', '-id'))
+        )
+        self.assertIn(post, follow_feed(self.follower))
+
+    def test_migration_fills_existing_follows(self):
+        """Подписки, оформленные до появления лент, попадают в ленты."""
+        migration = import_module('posts.migrations.0021_feed_entries_data')
+        Follow.objects.create(author=self.author, user=self.follower)
+        FeedEntry.objects.all().delete()
+        migration.fill_feeds(apps, None)
+        self.assertEqual(
+            FeedEntry.objects.filter(user=self.follower).count(),
+            self.COUNT_POSTS_AUTHOR
+        )
+        with override_settings(FEED_FANOUT_LIMIT=1):
+            FeedEntry.objects.all().delete()
+            migration.fill_feeds(apps, None)
+        self.assertFalse(FeedEntry.objects.exists())
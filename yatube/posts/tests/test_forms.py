@@ -98,7 +98,7 @@ class PostFormTest(TestCase):
         )
         url_post = reverse('posts:post_detail', kwargs={'post_id': post.id})
         response = self.authorized_client.get(url_post)
-        before_last_comment = response.context['comments_list'].last()
+        comments_before = list(response.context['comments_list'])
 
         text = 'Тестовый текст.'
         response = self.authorized_client.post(reverse(
@@ -109,9 +109,9 @@ class PostFormTest(TestCase):
         self.assertRedirects(response, url_post)
 
         response = self.authorized_client.get(url_post)
-        after_last_comment = response.context['comments_list'].last()
+        comments_after = list(response.context['comments_list'])
 
-        self.assertNotEqual(before_last_comment, after_last_comment)
+        self.assertNotEqual(comments_before, comments_after)
 
     def test_guest_client_not_create_comments_post(self):
         """Неавторизованный пользователь не создаст комментарий."""
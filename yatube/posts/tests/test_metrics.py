@@ -0,0 +1,70 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(METRICS_SAMPLE_RATE=1)
+class MetricsMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='author')
+        Post.objects.create(text='Пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+
+    def test_collects_view_metrics(self):
+        """Запросы, кеш и шаблоны считаются по имени вида."""
+        client = Client()
+        with self.assertLogs('yatube.metrics', 'INFO') as logs:
+            client.get(reverse('posts:main'))
+            client.get(reverse('posts:main'))
+        stats = metrics.snapshot()['posts:main']
+        self.assertEqual(stats['requests'], 2)
+        # Ответ для анонима, страница ленты, длина ленты и карточка
+        # поста; второй запрос целиком отдается из кеша.
+        self.assertEqual(stats['cache_misses'], 4)
+        self.assertEqual(stats['cache_hits'], 1)
+        self.assertGreater(stats['queries_avg'], 0)
+        self.assertGreater(stats['template_ms_avg'], 0)
+        self.assertTrue(stats['slowest_sql'])
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['view'], 'posts:main')
+        self.assertEqual(line['status'], 200)
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_sampling(self):
+        Client().get(reverse('posts:main'))
+        self.assertEqual(metrics.snapshot(), {})
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            metrics.normalize_sql(
+                "SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x'"
+            ),
+            'SELECT * FROM t WHERE id IN (...) AND name = ?',
+        )
+
+    def test_endpoint_access(self):
+        url = reverse('metrics')
+        for address in ('10.0.0.1', '127.0.0.1'):
+            with self.subTest(address=address):
+                response = Client(REMOTE_ADDR=address).get(url)
+                self.assertEqual(response.status_code, 403)
+        staff = User.objects.create(username='staff', is_staff=True)
+        client = Client(REMOTE_ADDR='10.0.0.1')
+        client.force_login(staff)
+        client.get(reverse('posts:main'))
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('posts:main', response.json())
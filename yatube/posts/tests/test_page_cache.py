@@ -0,0 +1,193 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from posts import page_cache
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class FeedPageCacheTest(TestCase):
+    COUNT_POSTS: int = 12
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='author',
+                                       first_name='Лев',
+                                       last_name='Толстой')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        for i in range(cls.COUNT_POSTS):
+            Post.objects.create(text=f'Пост {i}', author=cls.user,
+                                group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def get_page(self, **params):
+        request = self.factory.get('/', params)
+        return page_cache.feed_page(
+            request,
+            page_cache.main_feed(),
+            Post.objects.select_related('author', 'group'),
+        )
+
+    def test_cached_page_has_rows(self):
+        """Повторная страница собирается из кеша без запросов к БД."""
+        page_obj = self.get_page(page=2)
+        with self.assertNumQueries(0):
+            cached_page = self.get_page(page=2)
+            self.assertEqual(cached_page.number, page_obj.number)
+            self.assertEqual(cached_page.paginator.count, self.COUNT_POSTS)
+            for post, cached in zip(page_obj, cached_page):
+                self.assertEqual(cached.pk, post.pk)
+                self.assertEqual(cached.text, post.text)
+                self.assertEqual(cached.pub_date, post.pub_date)
+                self.assertEqual(cached.author.get_full_name(),
+                                 'Лев Толстой')
+                self.assertEqual(cached.group.slug, self.group.slug)
+
+    def test_post_create_invalidates_feeds(self):
+        """Создание поста через форму сбрасывает кеш лент."""
+        self.get_page()
+        self.client.post(reverse('posts:post_create'),
+                         data={'text': 'Свежий пост',
+                               'group': self.group.id})
+        self.assertEqual(self.get_page()[0].text, 'Свежий пост')
+
+    def test_comment_invalidates_feeds(self):
+        """Комментарий меняет версию лент поста."""
+        post = Post.objects.first()
+        versions = [page_cache.feed_version(feed)
+                    for feed in page_cache.post_feeds(post)]
+        Comment.objects.create(post=post, author=self.user, text='Текст')
+        self.assertEqual(
+            [page_cache.feed_version(feed)
+             for feed in page_cache.post_feeds(post)],
+            [version + 1 for version in versions]
+        )
+
+
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        Post.objects.create(text='Пост', author=cls.user, group=cls.group)
+        cls.urls = [
+            reverse('posts:main'),
+            reverse('posts:group_list', args=[cls.group.slug]),
+            reverse('posts:profile', args=[cls.user.username]),
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_guest_gets_stored_response(self):
+        """Повторный ответ анониму не рендерится."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                first = Client().get(url)
+                second = Client().get(url)
+                self.assertIsNotNone(first.context)
+                self.assertIsNone(second.context)
+                self.assertEqual(second.content, first.content)
+                self.assertEqual(second['Content-Type'],
+                                 first['Content-Type'])
+
+    def test_pages_cached_separately(self):
+        client = Client()
+        client.get(self.urls[0])
+        self.assertIsNotNone(client.get(self.urls[0] + '?page=2').context)
+
+    def test_session_bypasses_cache(self):
+        client = Client()
+        client.force_login(self.user)
+        client.get(self.urls[0])
+        self.assertIsNotNone(client.get(self.urls[0]).context)
+        Client().get(self.urls[0])
+        self.assertIsNotNone(client.get(self.urls[0]).context)
+
+    def test_new_post_purges_feed(self):
+        for url in self.urls:
+            Client().get(url)
+        Post.objects.create(text='Свежий пост', author=self.user,
+                            group=self.group)
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertContains(Client().get(url), 'Свежий пост')
+
+    def test_other_feed_kept(self):
+        other = User.objects.create(username='other')
+        Client().get(self.urls[2])
+        Post.objects.create(text='Чужой пост', author=other)
+        self.assertIsNone(Client().get(self.urls[2]).context)
+
+    def test_orm_save_and_delete_purge_feeds(self):
+        """Правка из админки или ORM сбрасывает страницы так же, как вид."""
+        post = Post.objects.get()
+        for url in self.urls:
+            Client().get(url)
+        post.text = 'Исправленный пост'
+        post.save()
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertContains(Client().get(url), 'Исправленный пост')
+        post.delete()
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertNotContains(Client().get(url), 'Исправленный пост')
+
+    def test_moved_post_leaves_old_group(self):
+        other = Group.objects.create(title='Другая', slug='other',
+                                     description='Описание')
+        client = Client()
+        client.force_login(self.user)
+        post = Post.objects.get()
+        Client().get(self.urls[1])
+        client.post(reverse('posts:post_edit', args=(post.id,)),
+                    data={'text': 'Перенесенный', 'group': other.id})
+        self.assertNotContains(
+            Client().get(self.urls[1]),
+            reverse('posts:post_detail', args=(post.id,)),
+        )
+        self.assertContains(
+            Client().get(reverse('posts:group_list', args=[other.slug])),
+            'Перенесенный',
+        )
+
+    def test_rename_purges_all_feeds(self):
+        """Новый адрес группы и имя автора видны во всех лентах."""
+        etag = Client().get(self.urls[0])['ETag']
+        group = Group.objects.get()
+        group.slug = 'renamed'
+        group.save()
+        response = Client().get(self.urls[0], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response,
+                            reverse('posts:group_list', args=['renamed']))
+        user = User.objects.get()
+        user.first_name = 'Новое имя'
+        user.save()
+        for url in (self.urls[0], self.urls[2]):
+            with self.subTest(url=url):
+                self.assertContains(Client().get(url), 'Новое имя')
+
+    def test_login_keeps_feeds(self):
+        """Вход меняет ``last_login``, но не версии лент."""
+        user = User.objects.get()
+        user.set_password('password')
+        user.save()
+        self.assertIsNotNone(Client().get(self.urls[0]).context)
+        client = Client()
+        self.assertTrue(client.login(username=user.username,
+                                     password='password'))
+        self.assertIsNone(Client().get(self.urls[0]).context)
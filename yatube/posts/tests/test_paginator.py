@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+from posts.utils import CursorPaginator, page_window
+
+User = get_user_model()
+
+
+class PageWindowTest(TestCase):
+    def test_window(self):
+        cases = {
+            (1, 1): [1],
+            (1, 5): [1, 2, 3, 4, 5],
+            (1, 100): [1, 2, 3, None, 100],
+            (50, 100): [1, None, 48, 49, 50, 51, 52, None, 100],
+            (4, 100): [1, 2, 3, 4, 5, 6, None, 100],
+            (100, 100): [1, None, 98, 99, 100],
+        }
+        for (number, num_pages), expected in cases.items():
+            with self.subTest(number=number, num_pages=num_pages):
+                self.assertEqual(page_window(number, num_pages, 2),
+                                 expected)
+
+
+@override_settings(COUNT_POSTS=2)
+class EstimatedCountTest(TestCase):
+    COUNT_POSTS: int = 9
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='author')
+        for i in range(cls.COUNT_POSTS):
+            Post.objects.create(text=f'Пост {i}', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def paginator(self, count: int) -> CursorPaginator:
+        return CursorPaginator(Post.objects.all(), 2,
+                               count=lambda: count, estimated=True)
+
+    def test_low_estimate_keeps_next_page(self):
+        paginator = self.paginator(2)
+        page = paginator.page(1)
+        self.assertTrue(page.has_next())
+        page = paginator.cursor_page(page.next_cursor)
+        self.assertEqual(page.number, 2)
+        self.assertTrue(page.has_next())
+
+    def test_high_estimate_corrected_on_last_page(self):
+        paginator = self.paginator(100)
+        page = paginator.page(5)
+        self.assertEqual(len(page), 1)
+        self.assertFalse(page.has_next())
+        self.assertEqual(paginator.num_pages, 5)
+
+    def test_page_past_end_falls_back(self):
+        page = self.paginator(100).get_page(20)
+        self.assertEqual(page.number, 5)
+        self.assertEqual([post.text for post in page], ['Пост 0'])
+
+    @override_settings(COUNT_POSTS=1)
+    def test_navigation_is_windowed(self):
+        """1, 2, 3, …, 9 и «Следующая» вместо всех страниц."""
+        response = Client().get(reverse('posts:main'))
+        self.assertEqual(
+            response.content.decode().count('class="page-link"'), 6
+        )
+        self.assertContains(response, '&hellip;')
+
+    def test_bad_cursor_not_found(self):
+        response = Client().get(reverse('posts:main'), {'cursor': 'мусор'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_needs_two_keys(self):
+        for ordering in (['-pub_date'], ['-pub_date', 'id']):
+            with self.subTest(ordering=ordering):
+                with self.assertRaises(ValueError):
+                    CursorPaginator(Post.objects.order_by(*ordering), 2)
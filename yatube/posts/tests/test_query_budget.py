@@ -0,0 +1,113 @@
+import shutil
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.template.base import Template
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import view_counts
+from posts.models import Comment, Follow, Group, Post
+from posts.benchmark import SMALL_GIF
+from posts.tests.utils import TEMP_MEDIA_ROOT
+
+User = get_user_model()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class QueryBudgetTest(TestCase):
+    """
+    Число запросов каждой страницы не зависит от числа постов,
+    а шаблоны не догружают связи моделей posts.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='reader')
+        cls.author = User.objects.create(username='author',
+                                         first_name='Лев',
+                                         last_name='Толстой')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        Follow.objects.create(user=cls.user, author=cls.author)
+        for i in range(15):
+            post = Post.objects.create(
+                text=f'Пост {i}',
+                author=cls.author if i % 2 else cls.user,
+                group=cls.group if i % 3 else None,
+                image=SimpleUploadedFile(f'small{i}.gif', SMALL_GIF,
+                                         content_type='image/gif'),
+            )
+            Comment.objects.create(post=post, author=cls.author,
+                                   text='Комментарий')
+        cls.post = post
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        view_counts.buffer.take()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def pages(self):
+        """Страницы чтения и их бюджет запросов при холодном кеше."""
+        return {
+            reverse('posts:main'): 4,
+            reverse('posts:group_list', args=[self.group.slug]): 5,
+            reverse('posts:profile', args=[self.author.username]): 7,
+            reverse('posts:post_detail', args=[self.post.id]): 6,
+            reverse('posts:follow_index'): 5,
+            reverse('posts:search') + '?q=пост': 4,
+        }
+
+    def test_query_budget(self):
+        budgets = {
+            **self.pages(),
+            reverse('posts:post_create'): 5,
+            reverse('posts:post_edit', args=[self.post.id]): 7,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(budget):
+                    self.client.get(url)
+
+    def template_queries(self, url) -> list:
+        """Запросы, сделанные при отрисовке шаблонов страницы."""
+        captured, depth, render = [], [], Template.render
+
+        def capture(template, context):
+            if depth:
+                return render(template, context)
+            depth.append(template)
+            try:
+                with CaptureQueriesContext(connection) as queries:
+                    captured.append(queries)
+                    return render(template, context)
+            finally:
+                depth.pop()
+
+        with mock.patch.object(Template, 'render', capture):
+            self.client.get(url)
+        return [query['sql'] for queries in captured for query in queries]
+
+    def test_templates_do_not_lazy_load(self):
+        """
+        Шаблоны не делают запросов, кроме чтения сессии и текущего
+        пользователя, — все данные загружает вид.
+        """
+        user = f'FROM "auth_user" WHERE "auth_user"."id" = {self.user.id}'
+        expected = ('"django_session"', user)
+        for url in self.pages():
+            with self.subTest(url=url):
+                lazy = [sql for sql in self.template_queries(url)
+                        if not any(part in sql for part in expected)]
+                self.assertEqual(lazy, [])
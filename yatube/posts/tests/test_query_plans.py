@@ -0,0 +1,73 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN из SQLite')
+class QueryPlanTest(TestCase):
+    """Запросы списков читают индекс, а не сканируют и сортируют таблицу."""
+    COUNT_POSTS: int = 30
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        Follow.objects.create(author=cls.author, user=cls.reader)
+        for i in range(cls.COUNT_POSTS):
+            Post.objects.create(text=f'Пост {i}', author=cls.author,
+                                group=cls.group)
+        cls.post = Post.objects.first()
+        Comment.objects.create(post=cls.post, author=cls.reader,
+                               text='Комментарий')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def explain(self, sql: str, params) -> list[str]:
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def bad_steps(self, plan: list[str]) -> list[str]:
+        return [
+            step for step in plan
+            if 'TEMP B-TREE' in step
+            or (step.startswith('SCAN') and 'INDEX' not in step)
+        ]
+
+    def test_list_queries_use_indexes(self):
+        urls = [
+            reverse('posts:main'),
+            reverse('posts:main') + '?page=2',
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.author.username,)),
+            reverse('posts:follow_index'),
+            reverse('posts:post_detail', args=(self.post.id,)),
+            reverse('posts:trending'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    self.client.get(url)
+                for query in queries.captured_queries:
+                    sql = query['sql']
+                    if not sql.startswith('SELECT') or 'posts_' not in sql:
+                        continue
+                    # В captured_queries параметры уже подставлены.
+                    plan = self.explain(sql, ())
+                    self.assertEqual(self.bad_steps(plan), [],
+                                     f'{sql}\n{plan}')
@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.db_router import ReplicaRouter
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRoutingTest(TransactionTestCase):
+    """Реплика — отдельный файл SQLite, данные в нее пишутся вручную."""
+
+    databases = {'default', 'replica1'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        connections.databases['replica1'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(cls.tmp, 'replica.sqlite3'),
+        }
+        super().setUpClass()
+        call_command('migrate', database='replica1', verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica1'].close()
+        del connections.databases['replica1']
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('author', password='пароль')
+        User.objects.using('replica1').bulk_create([
+            User(id=self.user.id, username='author',
+                 password=self.user.password),
+        ])
+        post = Post(text='Пост с реплики', author_id=self.user.id)
+        post.summarize()
+        Post.objects.using('replica1').bulk_create([post])
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_reads_from_replica_until_write(self):
+        """После записи пользователь сразу видит основную базу."""
+        self.assertContains(self.client.get(reverse('posts:main')),
+                            'Пост с реплики')
+        response = self.client.post(reverse('posts:post_create'),
+                                    {'text': 'Новый пост'})
+        self.assertIn('primary_until', response.cookies)
+        response = self.client.get(reverse('posts:main'))
+        self.assertContains(response, 'Новый пост')
+        self.assertNotContains(response, 'Пост с реплики')
+
+    def test_replica_page_not_cached_after_write(self):
+        """
+        Страница, собранная с отстающей реплики сразу после записи, не
+        попадает в общий кеш, и автор видит свой пост.
+        """
+        self.client.get(reverse('posts:main'))
+        self.client.post(reverse('posts:post_create'), {'text': 'Новый пост'})
+        for name, reader in (('гость', Client()),
+                             ('читатель', self.other_reader())):
+            with self.subTest(reader=name):
+                self.assertNotContains(reader.get(reverse('posts:main')),
+                                       'Новый пост')
+        self.assertContains(self.client.get(reverse('posts:main')),
+                            'Новый пост')
+
+    def other_reader(self) -> Client:
+        reader = User.objects.create_user('reader', password='пароль')
+        User.objects.using('replica1').bulk_create([
+            User(id=reader.id, username='reader', password=reader.password),
+        ])
+        client = Client()
+        client.force_login(reader)
+        return client
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        self.assertNotContains(self.client.get(reverse('posts:main')),
+                               'Пост с реплики')
+
+    def test_outside_requests_use_primary(self):
+        self.assertIsNone(ReplicaRouter().db_for_read(Post))
+        self.assertEqual(ReplicaRouter().db_for_write(Post), 'default')
+        self.assertFalse(Post.objects.filter(text='Пост с реплики').exists())
@@ -0,0 +1,97 @@
+import sqlite3
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import search
+from posts.models import Post, SearchTerm
+
+User = get_user_model()
+
+
+def fts5_available() -> bool:
+    try:
+        sqlite3.connect(':memory:').execute(
+            'CREATE VIRTUAL TABLE fts USING fts5(text)'
+        )
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+class StemmerTest(TestCase):
+    def test_stem(self):
+        """Формы одного слова сводятся к общей основе."""
+        cases = {
+            'книга': 'книг',
+            'книгами': 'книг',
+            'красивая': 'красив',
+            'красивые': 'красив',
+            'программирования': 'программирован',
+            'читали': 'чита',
+            'читающий': 'чита',
+            'ёлки': 'елк',
+        }
+        for word, expected in cases.items():
+            with self.subTest(word=word):
+                self.assertEqual(search.stem(word), expected)
+
+    def test_tokenize_skips_stop_words(self):
+        self.assertEqual(search.tokenize('Кот и книги, а также Django!'),
+                         ['кот', 'книг', 'такж', 'django'])
+
+
+class SearchTestMixin:
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='author')
+        cls.book = Post.objects.create(
+            text='Прочитал книгу про красивые сады', author=cls.user)
+        cls.books = Post.objects.create(
+            text='Книги, книги и еще раз книги о садах', author=cls.user)
+        cls.other = Post.objects.create(
+            text='Сегодня был дождь', author=cls.user)
+
+    def test_morphology_and_ranking(self):
+        """Поиск находит другие формы слова и ранжирует по частоте."""
+        self.assertEqual(search.search('книгами'),
+                         [self.books.id, self.book.id])
+
+    def test_all_words_required(self):
+        self.assertEqual(search.search('красивый сад'), [self.book.id])
+        self.assertEqual(search.search('книга дождь'), [])
+
+    def test_index_follows_edits(self):
+        """Правка и удаление поста меняют индекс."""
+        other = Post.objects.get(id=self.other.id)
+        other.text = 'Дождь смыл все книги'
+        other.save()
+        self.assertIn(other.id, search.search('книга'))
+        Post.objects.get(id=self.book.id).delete()
+        self.assertNotIn(self.book.id, search.search('книга'))
+
+    def test_search_view(self):
+        response = Client().get(reverse('posts:search'), {'q': 'книги'})
+        self.assertEqual(list(response.context['page_obj']),
+                         [self.books, self.book])
+        self.assertEqual(response.context['page_query'],
+                         'q=%D0%BA%D0%BD%D0%B8%D0%B3%D0%B8&')
+
+
+@skipUnless(fts5_available(), 'SQLite собран без FTS5')
+class FtsSearchTest(SearchTestMixin, TestCase):
+    def test_backend(self):
+        self.assertTrue(search.use_fts())
+        self.assertFalse(SearchTerm.objects.exists())
+
+
+@override_settings(SEARCH_BACKEND='python')
+class PythonSearchTest(SearchTestMixin, TestCase):
+    def test_backend(self):
+        self.assertFalse(search.use_fts())
+        self.assertEqual(
+            SearchTerm.objects.get(post=self.books, term='книг').weight, 3
+        )
@@ -0,0 +1,102 @@
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+LONG_TEXT = ' '.join(f'слово{i}' for i in range(100))
+
+
+class PostSummaryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_summary_on_save(self):
+        post = Post.objects.create(text=LONG_TEXT, author=self.user)
+        self.assertEqual(post.word_count, 100)
+        self.assertEqual(len(post.title), 30)
+        self.assertTrue(post.excerpt.startswith('слово0 слово1'))
+        self.assertTrue(post.excerpt.endswith('слово29 …'))
+
+    def test_summary_follows_form_edit(self):
+        post = Post.objects.create(text=LONG_TEXT, author=self.user)
+        self.client.post(reverse('posts:post_edit', args=[post.id]),
+                         {'text': 'Короткий текст'})
+        post.refresh_from_db()
+        self.assertEqual(
+            (post.title, post.excerpt, post.word_count),
+            ('Короткий текст', 'Короткий текст', 2),
+        )
+
+    def test_str_without_text(self):
+        Post.objects.create(text=LONG_TEXT, author=self.user)
+        post = Post.objects.cards().get()
+        with self.assertNumQueries(0):
+            self.assertEqual(str(post), LONG_TEXT[:15])
+
+    def test_feed_pages_skip_text(self):
+        Post.objects.create(text=LONG_TEXT, author=self.user,
+                            group=self.group)
+        urls = [
+            reverse('posts:main'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:follow_index'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    self.client.get(url)
+                self.assertFalse(any(
+                    '"posts_post"."text"' in query['sql']
+                    for query in queries
+                ))
+
+    def test_cached_page_keeps_text_deferred(self):
+        Post.objects.create(text=LONG_TEXT, author=self.user)
+        self.client.get(reverse('posts:main'))
+        response = self.client.get(reverse('posts:main'))
+        post = response.context['page_obj'][0]
+        self.assertIn('text', post.get_deferred_fields())
+        self.assertContains(response, 'слово29 …')
+
+    def test_backfill(self):
+        post = Post(text=LONG_TEXT, author=self.user)
+        Post.objects.bulk_create([post])
+        out = StringIO()
+        call_command('backfill_post_summaries', stdout=out)
+        self.assertIn('Обработано постов: 1', out.getvalue())
+        post = Post.objects.get()
+        self.assertEqual(post.word_count, 100)
+        self.assertTrue(post.excerpt)
+
+    def test_migration_fills_existing_posts(self):
+        """Посты, созданные до миграции, получают сводку при миграции."""
+        migration = import_module('posts.migrations.0020_post_summary_data')
+        post = Post.objects.create(text=LONG_TEXT, author=self.user)
+        summary = (post.title, post.excerpt, post.word_count)
+        Post.objects.update(title='', excerpt='', word_count=0)
+        migration.fill_summaries(apps, None)
+        post.refresh_from_db()
+        self.assertEqual((post.title, post.excerpt, post.word_count),
+                         summary)
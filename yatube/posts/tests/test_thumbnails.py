@@ -0,0 +1,66 @@
+import shutil
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import thumbnails
+from posts.models import Post
+from posts.benchmark import SMALL_GIF
+from posts.tests.utils import TEMP_MEDIA_ROOT
+
+User = get_user_model()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def create_post(self) -> Post:
+        with mock.patch.object(thumbnails, 'schedule',
+                               wraps=thumbnails.schedule) as schedule:
+            self.client.post(reverse('posts:post_create'), data={
+                'text': 'Пост с картинкой',
+                'image': SimpleUploadedFile('small.gif', SMALL_GIF,
+                                            content_type='image/gif'),
+            })
+        self.assertEqual(schedule.call_count, 1)
+        return Post.objects.get()
+
+    def test_thumbnail_generated_out_of_request(self):
+        """Миниатюра готовится вне запроса и сохраняется в посте."""
+        post = self.create_post()
+        self.assertEqual(post.image_thumbnail, '')
+
+        thumbnails.generate(post.id)
+
+        post.refresh_from_db()
+        self.assertTrue(post.image_thumbnail.startswith(settings.MEDIA_URL))
+
+    def test_list_does_not_render_thumbnails(self):
+        """Страница ленты не обращается к sorl-thumbnail."""
+        post = self.create_post()
+        thumbnails.generate(post.id)
+        post.refresh_from_db()
+        cache.clear()
+        with mock.patch('sorl.thumbnail.base.ThumbnailBackend.get_thumbnail',
+                        side_effect=AssertionError):
+            response = self.client.get(reverse('posts:main'))
+        self.assertContains(response, post.image_thumbnail)
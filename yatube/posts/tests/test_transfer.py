@@ -0,0 +1,127 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from posts import search
+from posts.transfer import Importer, open_stream
+from posts.models import (Comment, FeedEntry, Follow, Group, Post,
+                          UserStats)
+from posts.benchmark import SMALL_GIF
+from posts.tests.utils import TEMP_MEDIA_ROOT
+
+User = get_user_model()
+
+PUB_DATE = datetime(2020, 5, 17, 12, 30, tzinfo=timezone.utc)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class TransferTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.dump = os.path.join(self.tmp, 'posts.ndjson.gz')
+        self.media = os.path.join(self.tmp, 'media')
+        self.author = User.objects.create_user('author', password='секрет')
+        self.reader = User.objects.create(username='reader')
+        self.group = Group.objects.create(title='Группа', slug='group',
+                                          description='Описание')
+        self.post = Post.objects.create(
+            text='Пост про книги', author=self.author, group=self.group,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF,
+                                     content_type='image/gif'),
+        )
+        Post.objects.filter(id=self.post.id).update(pub_date=PUB_DATE)
+        for i in range(3):
+            Post.objects.create(text=f'Пост {i}', author=self.reader)
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text='Комментарий')
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.update(created=PUB_DATE)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def export(self):
+        call_command('export_posts', self.dump, media_dir=self.media,
+                     chunk_size=2, stderr=StringIO())
+
+    def test_round_trip(self):
+        """Выгрузка в пустую базу восстанавливает данные и производные."""
+        self.export()
+        image = self.post.image.name
+        self.assertTrue(os.path.exists(os.path.join(self.media, image)))
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        default_storage.delete(image)
+
+        call_command('import_posts', self.dump, media_dir=self.media,
+                     batch_size=2, stdout=StringIO())
+
+        post = Post.objects.get(id=self.post.id)
+        self.assertEqual(post.pub_date, PUB_DATE)
+        self.assertEqual(post.author.username, 'author')
+        self.assertEqual(post.group.slug, 'group')
+        self.assertTrue(post.author.check_password('секрет'))
+        self.assertTrue(default_storage.exists(image))
+        self.assertEqual(Post.objects.count(), 4)
+        self.assertEqual(post.comments.get().author.username, 'reader')
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(UserStats.of(post.author).followers_count, 1)
+        self.assertEqual(Follow.objects.get().created, PUB_DATE)
+        self.assertTrue(FeedEntry.objects.filter(post=post).exists())
+        self.assertEqual(search.search('книги'), [post.id])
+
+    def test_import_skips_existing(self):
+        """Повторная загрузка ничего не дублирует."""
+        self.export()
+        call_command('import_posts', self.dump, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 4)
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(Follow.objects.count(), 1)
+
+    def test_reimport_keeps_edited_posts(self):
+        """Пропущенные строки не переиндексируются и не считаются."""
+        self.export()
+        self.post.text = 'совсем другое сообщение'
+        self.post.save()
+        with open_stream(self.dump, 'r') as stream:
+            totals = Importer().load(stream)
+        self.assertEqual(set(totals.values()), {0})
+        self.assertEqual(search.search('сообщение'), [self.post.id])
+        self.assertEqual(search.search('книги'), [])
+
+    def test_export_is_streamed_ndjson(self):
+        dump = os.path.join(self.tmp, 'posts.ndjson')
+        call_command('export_posts', dump, stderr=StringIO())
+        with open(dump, encoding='utf-8') as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(
+            [record['model'] for record in records],
+            ['user'] * 2 + ['group'] + ['post'] * 4 + ['comment', 'follow'],
+        )
+        self.assertEqual(records[-1],
+                         {'model': 'follow', 'user': 'reader',
+                          'author': 'author',
+                          'created': '2020-05-17T12:30:00Z'})
+
+    def test_taken_post_id_keeps_comments_off(self):
+        """Комментарии поста, чей id занят чужим постом, не загружаются."""
+        self.export()
+        post_id = self.post.id
+        self.post.delete()
+        Post.objects.create(id=post_id, text='Чужой пост', author=self.reader)
+        with open_stream(self.dump, 'r') as stream:
+            importer = Importer()
+            importer.load(stream)
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(importer.skipped, {'post': 1, 'comment': 1})
+        self.assertEqual(Post.objects.get(id=post_id).text, 'Чужой пост')
@@ -0,0 +1,135 @@
+import math
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import trending, view_counts
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.quiet = Group.objects.create(title='Тихая', slug='quiet',
+                                         description='Описание')
+        cls.old = Post.objects.create(text='Старый', author=cls.author,
+                                      group=cls.quiet)
+        cls.new = Post.objects.create(text='Новый', author=cls.author,
+                                      group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        view_counts.buffer.take()
+
+    def score(self, obj) -> float:
+        obj.refresh_from_db(fields=['trending_score'])
+        return obj.trending_score
+
+    def comment(self, post):
+        Comment.objects.create(post=post, author=self.reader,
+                               text='Комментарий')
+
+    def test_log_sum(self):
+        self.assertAlmostEqual(trending.log_sum([math.log(2), math.log(3)]),
+                               math.log(5))
+        self.assertEqual(trending.log_sum([None]), 0.0)
+
+    def test_events_add_up(self):
+        """Оценка — логарифм суммы вкладов всех событий."""
+        now = timezone.now()
+        before = self.score(self.old)
+        self.comment(self.old)
+        expected = trending.log_sum([before, trending.point('comment', now)])
+        self.assertAlmostEqual(self.score(self.old), expected, places=3)
+
+    def test_decay(self):
+        """Через полупериод событие весит вдвое меньше."""
+        now = timezone.now()
+        later = now + timedelta(seconds=settings.TRENDING_HALF_LIFE)
+        self.assertAlmostEqual(
+            trending.point('comment', later) - trending.point('comment', now),
+            math.log(2),
+        )
+
+    def test_activity_lifts_post_and_group(self):
+        self.assertEqual(list(trending.trending_posts(2)),
+                         [self.new, self.old])
+        for _ in range(3):
+            self.comment(self.old)
+        self.assertEqual(list(trending.trending_posts(2)),
+                         [self.old, self.new])
+        self.assertEqual(list(trending.trending_groups(2)),
+                         [self.quiet, self.group])
+
+    def test_views_and_follows(self):
+        view_counts.record(self.old.id, None)
+        before = self.score(self.old)
+        view_counts.flush()
+        self.assertGreater(self.score(self.old), before)
+        before = self.score(self.new)
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertGreater(self.score(self.new), before)
+
+    def test_old_follows_are_not_fresh(self):
+        """Подписки до миграции 0019 не считаются свежими."""
+        migration = import_module('posts.migrations.0019_trending')
+        created = migration.Migration.operations[0].field.default
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.update(created=created)
+        Post.objects.update(trending_score=0)
+        trending.recompute()
+        self.assertAlmostEqual(self.score(self.new),
+                               trending.point('post', self.new.pub_date),
+                               places=3)
+
+    def test_recompute_matches_events(self):
+        """Пересчет дает те же оценки, что и события по одному."""
+        self.comment(self.new)
+        Follow.objects.create(user=self.reader, author=self.author)
+        scores = [self.score(self.old), self.score(self.new),
+                  self.score(self.group)]
+        Post.objects.update(trending_score=0)
+        Group.objects.update(trending_score=0)
+        out = StringIO()
+        call_command('recompute_trending', stdout=out)
+        self.assertIn('Пересчитано постов: 2', out.getvalue())
+        for obj, score in zip([self.old, self.new, self.group], scores):
+            with self.subTest(obj=obj):
+                self.assertAlmostEqual(self.score(obj), score, places=3)
+
+    def test_recompute_forgets_deleted(self):
+        self.comment(self.old)
+        Comment.objects.all().delete()
+        trending.recompute()
+        self.assertAlmostEqual(
+            self.score(self.old),
+            trending.point('post', self.old.pub_date), places=6,
+        )
+
+    def test_page_reads(self):
+        """Страница — по одному чтению на список, без агрегатов."""
+        self.client = Client()
+        self.comment(self.old)
+        url = reverse('posts:trending')
+        self.client.get(url)
+        cache.clear()
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(list(response.context['posts']),
+                         [self.old, self.new])
+        self.assertContains(response, self.quiet.title)
@@ -0,0 +1,145 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import counters, etags, view_counts
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ViewCountsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.posts = [
+            Post.objects.create(text=f'Пост {i}', author=cls.author,
+                                group=cls.group if i else None)
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        view_counts.buffer.take()
+        self.client = Client()
+
+    def views(self, obj) -> int:
+        obj.refresh_from_db(fields=['views_count'])
+        return obj.views_count
+
+    def open(self, post, times=1):
+        for _ in range(times):
+            self.client.get(reverse('posts:post_detail', args=(post.id,)))
+
+    def test_views_buffered_until_flush(self):
+        self.open(self.posts[1], 3)
+        self.open(self.posts[2])
+        self.assertEqual(self.views(self.posts[1]), 0)
+        # Чтение групп и авторов, по UPDATE просмотров и популярности для
+        # постов и для групп; еще два — точка сохранения.
+        with self.assertNumQueries(7):
+            self.assertEqual(view_counts.flush(), 2)
+        self.assertEqual(self.views(self.posts[1]), 3)
+        self.assertEqual(self.views(self.posts[2]), 1)
+        self.assertEqual(self.views(self.group), 4)
+        self.assertEqual(view_counts.flush(), 0)
+
+    def test_author_views_not_counted(self):
+        self.client.force_login(self.author)
+        self.open(self.posts[0])
+        self.assertEqual(view_counts.flush(), 0)
+
+    def test_not_modified_counted(self):
+        """Повторный просмотр с ответом 304 тоже засчитывается."""
+        url = reverse('posts:post_detail', args=(self.posts[1].id,))
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        view_counts.flush()
+        self.assertEqual(self.views(self.posts[1]), 2)
+
+    def test_flush_keeps_pages_until_window(self):
+        """
+        Сброс не трогает кеш и ETag страниц: новые числа видны со
+        следующим окном ``views_window``.
+        """
+        url = reverse('posts:post_detail', args=(self.posts[1].id,))
+        group_url = reverse('posts:group_list', args=(self.group.slug,))
+        group_etag = Client().get(group_url)['ETag']
+        etag = self.client.get(url)['ETag']
+        view_counts.flush()
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+        self.assertEqual(Client().get(
+            group_url, HTTP_IF_NONE_MATCH=group_etag
+        ).status_code, 304)
+        self.assertContains(Client().get(group_url),
+                            'Просмотров постов группы: 0')
+        window = etags.views_window() + 1
+        with mock.patch.object(etags, 'views_window', return_value=window):
+            self.assertContains(Client().get(group_url),
+                                'Просмотров постов группы: 1')
+            self.assertEqual(
+                self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+                200
+            )
+
+    @override_settings(VIEW_COUNTS_FLUSH_INTERVAL=0)
+    def test_flush_after_request(self):
+        self.open(self.posts[0], 2)
+        self.assertEqual(self.views(self.posts[0]), 2)
+
+    @override_settings(VIEW_COUNTS_MAX_PENDING=2)
+    def test_flush_when_buffer_full(self):
+        self.open(self.posts[0])
+        self.assertEqual(self.views(self.posts[0]), 0)
+        self.open(self.posts[1])
+        self.assertEqual(self.views(self.posts[0]), 1)
+
+    @override_settings(VIEW_COUNTS_FLUSH_INTERVAL=0.01)
+    def test_flusher_flushes_idle_process(self):
+        """Поток сбрасывает просмотры и без следующего запроса."""
+        called = threading.Event()
+        flusher = view_counts.Flusher()
+        with mock.patch.object(view_counts, 'flush_if_due',
+                               side_effect=called.set):
+            flusher.start()
+            self.assertTrue(called.wait(5))
+            flusher.stop()
+            flusher.join(5)
+        self.assertFalse(flusher.is_alive())
+
+    def test_failed_flush_keeps_views(self):
+        self.open(self.posts[1], 2)
+        with mock.patch.object(view_counts, '_increment',
+                               side_effect=DatabaseError):
+            with self.assertLogs('posts.view_counts', 'ERROR'):
+                self.assertEqual(view_counts.flush(), 0)
+        view_counts.flush()
+        self.assertEqual(self.views(self.posts[1]), 2)
+
+    def test_group_totals_follow_posts(self):
+        """Перенос и удаление поста переносят его просмотры."""
+        self.open(self.posts[1], 2)
+        self.open(self.posts[2])
+        view_counts.flush()
+        post = Post.objects.get(id=self.posts[1].id)
+        post.group = None
+        post.save()
+        self.assertEqual(self.views(self.group), 1)
+        Post.objects.get(id=self.posts[2].id).delete()
+        self.assertEqual(self.views(self.group), 0)
+
+    def test_reconcile_group_views(self):
+        Post.objects.filter(id=self.posts[1].id).update(views_count=5)
+        self.assertEqual(counters.reconcile()['group.views_count'], 1)
+        self.assertEqual(self.views(self.group), 5)
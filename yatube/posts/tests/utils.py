@@ -0,0 +1,5 @@
+import tempfile
+
+from django.conf import settings
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
@@ -0,0 +1,39 @@
+from sorl.thumbnail import get_thumbnail
+from jobs.queue import task
+from . import page_cache
+from .models import Post
+
+GEOMETRY = '960x339'
+"""Размер миниатюры из posts/includes/post_image.html."""
+OPTIONS = {'crop': 'center', 'upscale': True}
+
+
+@task(priority=0)
+def generate(post_id: int):
+    """
+    Готовит миниатюру поста и сохраняет ее адрес в посте. Ошибка
+    sorl-thumbnail остается в задаче очереди, и та повторяется.
+    """
+    post = Post.objects.only('image', 'author_id', 'group_id').filter(
+        id=post_id
+    ).first()
+    if post is None:
+        return
+    url = ''
+    if post.image:
+        url = get_thumbnail(post.image, GEOMETRY, **OPTIONS).url
+    # Картинку могли заменить, пока готовилась миниатюра.
+    Post.objects.filter(id=post_id, image=post.image.name).update(
+        image_thumbnail=url
+    )
+    page_cache.invalidate(*page_cache.post_feeds(post))
+
+
+def schedule(post: Post):
+    """
+    Сбрасывает устаревшую миниатюру и ставит подготовку новой
+    в очередь задач (в той же транзакции, что и сам пост).
+    """
+    post.image_thumbnail = ''
+    Post.objects.filter(id=post.id).update(image_thumbnail='')
+    generate.delay(post.id)
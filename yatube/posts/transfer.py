@@ -0,0 +1,294 @@
+import gzip
+import json
+import os
+import shutil
+import sys
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import groupby
+from operator import attrgetter
+
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+from . import counters, feed, search
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+USER_FIELDS = ['username', 'first_name', 'last_name', 'email', 'password',
+               'is_active', 'date_joined']
+GROUP_FIELDS = ['slug', 'title', 'description']
+RECORDS = {
+    'user': (User, USER_FIELDS, {}),
+    'group': (Group, GROUP_FIELDS, {}),
+    'post': (Post, ['id', 'text', 'pub_date', 'image'], {
+        'author__username': 'author', 'group__slug': 'group',
+    }),
+    'comment': (Comment, ['id', 'post_id', 'text', 'created'], {
+        'author__username': 'author',
+    }),
+    'follow': (Follow, ['created'], {
+        'user__username': 'user', 'author__username': 'author',
+    }),
+}
+"""Порядок записей в выгрузке: ссылки идут только на уже выгруженное."""
+NATURAL_KEYS = {
+    'user': ['username'],
+    'group': ['slug'],
+    'post': ['id'],
+    'comment': ['id'],
+    'follow': ['user_id', 'author_id'],
+}
+"""Поля, по которым запись из выгрузки совпадает со строкой в базе."""
+DATE_PRECISION = timedelta(milliseconds=1)
+"""DjangoJSONEncoder отбрасывает микросекунды до миллисекунд."""
+
+
+@contextmanager
+def open_stream(path: str, mode: str):
+    """Файл (``.gz`` — сжатый) или stdin/stdout для ``-``."""
+    if path == '-':
+        yield sys.stdout if 'w' in mode else sys.stdin
+    elif path.endswith('.gz'):
+        with gzip.open(path, mode + 't', encoding='utf-8') as stream:
+            yield stream
+    else:
+        with open(path, mode, encoding='utf-8') as stream:
+            yield stream
+
+
+def _copy_file(source, target_path: str):
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    with open(target_path, 'wb') as target:
+        shutil.copyfileobj(source, target)
+
+
+def export(stream, media_dir=None, chunk_size=2000) -> dict:
+    """
+    Пишет пользователей, группы, посты, комментарии и подписки в NDJSON.
+
+    Строки читаются курсором пачками по ``chunk_size``, поэтому память
+    не зависит от объема базы. Картинки постов копируются в
+    ``media_dir`` с сохранением путей.
+    """
+    totals = {}
+    for name, (model, fields, related) in RECORDS.items():
+        rows = model.objects.order_by('pk').values(*fields, *related)
+        count = 0
+        for row in rows.iterator(chunk_size=chunk_size):
+            for lookup, key in related.items():
+                row[key] = row.pop(lookup)
+            if media_dir and row.get('image'):
+                target = os.path.join(media_dir, row['image'])
+                if not os.path.exists(target):
+                    with default_storage.open(row['image']) as source:
+                        _copy_file(source, target)
+            stream.write(json.dumps({'model': name, **row},
+                                    cls=DjangoJSONEncoder,
+                                    ensure_ascii=False))
+            stream.write('\n')
+            count += 1
+        totals[name] = count
+    return totals
+
+
+@contextmanager
+def _keep_dates():
+    """Даты из выгрузки не заменяются текущим временем (auto_now_add)."""
+    fields = [Post._meta.get_field('pub_date'),
+              Comment._meta.get_field('created'),
+              Follow._meta.get_field('created')]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Importer:
+    """
+    Загружает NDJSON из ``export`` пачками по ``batch_size`` строк.
+
+    Пользователи и группы сопоставляются по username и slug одним
+    запросом на пачку; id постов и комментариев сохраняются, как у
+    ``loaddata``. Уже существующие строки пропускаются.
+
+    Пост, чей id в базе занят другим постом (другой автор или дата),
+    пропускается вместе со своими комментариями — они не цепляются
+    к чужому посту; число таких записей — в ``skipped``.
+    """
+
+    def __init__(self, media_dir=None, batch_size=500, index=True):
+        self.media_dir = media_dir
+        self.batch_size = batch_size
+        self.index = index
+        self.totals = dict.fromkeys(RECORDS, 0)
+        self.skipped = {'post': 0, 'comment': 0}
+        self.post_ids = set()
+
+    def load(self, stream) -> dict:
+        records = (json.loads(line) for line in stream if line.strip())
+        with _keep_dates():
+            for name, rows in groupby(records, key=lambda row: row['model']):
+                if name not in RECORDS:
+                    raise ValueError(f'Неизвестная запись: {name}')
+                batch = []
+                for row in rows:
+                    batch.append(row)
+                    if len(batch) == self.batch_size:
+                        self.flush(name, batch)
+                        batch = []
+                if batch:
+                    self.flush(name, batch)
+        self.finish()
+        return self.totals
+
+    @transaction.atomic
+    def flush(self, name: str, rows: list[dict]):
+        built = getattr(self, f'build_{name}')(rows)
+        objects = self._missing(name, built)
+        model = RECORDS[name][0]
+        model.objects.bulk_create(objects, ignore_conflicts=True)
+        self.totals[name] += len(objects)
+        if name == 'post':
+            self._match_posts(built)
+            if self.index:
+                for post in objects:
+                    search.index_post(post)
+
+    @staticmethod
+    def _missing(name: str, objects: list) -> list:
+        """
+        Только записи, которых еще нет в базе (и первые из повторов в
+        пачке): одним запросом на пачку. Пропущенные не индексируются
+        и не попадают в итоги.
+        """
+        fields = NATURAL_KEYS[name]
+        key = attrgetter(*fields)
+        existing = set(RECORDS[name][0].objects.filter(**{
+            f'{field}__in': {getattr(obj, field) for obj in objects}
+            for field in fields
+        }).values_list(*fields, flat=len(fields) == 1))
+        missing = []
+        for obj in objects:
+            if key(obj) not in existing:
+                existing.add(key(obj))
+                missing.append(obj)
+        return missing
+
+    def _match_posts(self, posts: list[Post]):
+        """
+        Запоминает id постов выгрузки, которые теперь лежат в базе —
+        вставленные или совпавшие по автору и дате; остальные id заняты
+        чужими постами.
+        """
+        stored = {
+            post_id: (author_id, pub_date)
+            for post_id, author_id, pub_date in Post.objects.filter(
+                id__in=[post.id for post in posts]
+            ).values_list('id', 'author_id', 'pub_date')
+        }
+        for post in posts:
+            author_id, pub_date = stored.get(post.id, (None, None))
+            if (author_id == post.author_id
+                    and abs(pub_date - post.pub_date) < DATE_PRECISION):
+                self.post_ids.add(post.id)
+            else:
+                self.skipped['post'] += 1
+
+    @staticmethod
+    def _resolve(model, field: str, values) -> dict:
+        return dict(model.objects.filter(
+            **{f'{field}__in': set(values) - {None}}
+        ).values_list(field, 'id'))
+
+    def _users(self, rows, *keys) -> dict:
+        return self._resolve(
+            User, 'username', (row[key] for row in rows for key in keys)
+        )
+
+    def build_user(self, rows):
+        return [
+            User(**dict(row, date_joined=parse_datetime(row['date_joined'])))
+            for row in map(self._fields('user'), rows)
+        ]
+
+    def build_group(self, rows):
+        return [Group(**row) for row in map(self._fields('group'), rows)]
+
+    def build_post(self, rows):
+        users = self._users(rows, 'author')
+        groups = self._resolve(Group, 'slug', (row['group'] for row in rows))
+        posts = []
+        for row in rows:
+            if row['author'] not in users:
+                continue
+            if self.media_dir and row['image']:
+                self._copy_image(row['image'])
+            post = Post(
+                id=row['id'], text=row['text'],
+                pub_date=parse_datetime(row['pub_date']),
+                author_id=users[row['author']],
+                group_id=groups.get(row['group']),
+                image=row['image'],
+            )
+            post.summarize()
+            posts.append(post)
+        return posts
+
+    def build_comment(self, rows):
+        users = self._users(rows, 'author')
+        comments = []
+        for row in rows:
+            if row['post_id'] not in self.post_ids:
+                self.skipped['comment'] += 1
+            elif row['author'] in users:
+                comments.append(Comment(
+                    id=row['id'], post_id=row['post_id'],
+                    author_id=users[row['author']], text=row['text'],
+                    created=parse_datetime(row['created']),
+                ))
+        return comments
+
+    def build_follow(self, rows):
+        users = self._users(rows, 'user', 'author')
+        return [
+            Follow(user_id=users[row['user']], author_id=users[row['author']],
+                   created=parse_datetime(row['created']))
+            for row in rows
+            if row['user'] in users and row['author'] in users
+        ]
+
+    @staticmethod
+    def _fields(name: str):
+        fields = RECORDS[name][1]
+        return lambda row: {field: row[field] for field in fields}
+
+    def _copy_image(self, name: str):
+        source = os.path.join(self.media_dir, name)
+        if os.path.exists(source) and not default_storage.exists(name):
+            with open(source, 'rb') as file:
+                default_storage.save(name, File(file))
+
+    def finish(self):
+        """Все, что при обычной записи делают сигналы."""
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), [User, Group, Post, Comment, Follow]
+            ):
+                cursor.execute(sql)
+        counters.reconcile()
+        follows = Follow.objects.order_by('author_id').values_list(
+            'author_id', 'user_id'
+        )
+        for author_id, pairs in groupby(follows.iterator(),
+                                        key=lambda pair: pair[0]):
+            if not feed.is_pull_author(author_id):
+                feed.backfill([user_id for _, user_id in pairs], author_id)
@@ -0,0 +1,173 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from django.utils import timezone
+from .models import Comment, Follow, Group, Post
+
+BATCH_SIZE: int = 150
+"""Строк в одном UPDATE: CASE входит в него дважды, по пять параметров на
+строку, а SQLite берет 999."""
+
+
+def _rate() -> float:
+    """Скорость затухания λ: вклад события вдвое меньше через полупериод."""
+    return math.log(2) / settings.TRENDING_HALF_LIFE
+
+
+def point(event: str, when: datetime,
+          count: float = 1) -> Optional[float]:
+    """
+    Вклад ``count`` событий в момент ``when``: ln(w·n) + λ·t; ``None``,
+    если у события нулевой вес.
+
+    Оценка хранится как ln Σ w·e^(λ·t). Затухание к текущему моменту —
+    общий множитель e^(−λ·now), поэтому порядок по оценке не зависит
+    от времени чтения, а логарифм не дает ей переполниться.
+    """
+    weight = settings.TRENDING_WEIGHTS[event] * count
+    if weight <= 0:
+        return None
+    return math.log(weight) + _rate() * when.timestamp()
+
+
+def _spread(event: str, count: int, start: datetime,
+            end: datetime) -> Optional[float]:
+    """Вклад ``count`` событий, равномерно распределенных по [start, end]."""
+    value = point(event, end, count)
+    if value is None:
+        return None
+    span = _rate() * max((end - start).total_seconds(), 1)
+    return value + math.log(-math.expm1(-span) / span)
+
+
+def log_sum(points: Iterable[float]) -> float:
+    """ln Σ e^x без переполнения; 0 — пустая оценка."""
+    points = [value for value in points if value is not None]
+    if not points:
+        return 0.0
+    high = max(points)
+    return high + math.log(sum(math.exp(value - high) for value in points))
+
+
+def _log_add(value):
+    """SQL: ln(e^score + e^value) — прибавление события к оценке."""
+    score = F('trending_score')
+    return Greatest(score, value) + Ln(
+        Value(1.0) + Exp(-Abs(score - value)), output_field=FloatField()
+    )
+
+
+def _add(queryset, event: str, when: Optional[datetime] = None):
+    value = point(event, when or timezone.now())
+    if value is not None:
+        queryset.update(
+            trending_score=_log_add(Value(value, output_field=FloatField()))
+        )
+
+
+def _add_many(queryset, points: dict):
+    """Разные вклады для многих строк: одним CASE на пачку."""
+    ids = list(points)
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start:start + BATCH_SIZE]
+        value = Case(
+            *[When(id=pk, then=Value(points[pk], output_field=FloatField()))
+              for pk in batch],
+            output_field=FloatField(),
+        )
+        queryset.filter(id__in=batch).update(trending_score=_log_add(value))
+
+
+def post_published(post: Post):
+    _add(Post.objects.filter(id=post.id), 'post', post.pub_date)
+    if post.group_id:
+        _add(Group.objects.filter(id=post.group_id), 'post', post.pub_date)
+
+
+def post_commented(post: Post, when: datetime):
+    _add(Post.objects.filter(id=post.id), 'comment', when)
+    if post.group_id:
+        _add(Group.objects.filter(id=post.group_id), 'comment', when)
+
+
+def author_followed(author_id: int):
+    """Подписка поднимает недавние посты автора."""
+    since = timezone.now() - timedelta(seconds=settings.TRENDING_WINDOW)
+    _add(Post.objects.filter(author_id=author_id, pub_date__gte=since),
+         'follow')
+
+
+def posts_viewed(post_views: dict, group_views: dict):
+    """Просмотры из ``view_counts.flush``: число просмотров по id."""
+    now = timezone.now()
+    if point('view', now) is None:
+        return
+    for queryset, views in ((Post.objects, post_views),
+                            (Group.objects, group_views)):
+        _add_many(queryset, {
+            pk: point('view', now, count) for pk, count in views.items()
+        })
+
+
+def recompute(window: Optional[int] = None) -> int:
+    """
+    Пересчитывает оценки постов за ``window`` секунд и групп по этим
+    постам: несколько чтений и пакетные UPDATE, без запроса на пост.
+
+    Исправляет то, что не видно по событиям: удаленные комментарии и
+    отписки. Просмотры хранятся только числом, поэтому считаются
+    равномерно распределенными от публикации до текущего момента.
+    Возвращает число пересчитанных постов.
+    """
+    now = timezone.now()
+    since = now - timedelta(seconds=window or settings.TRENDING_WINDOW)
+    posts = list(Post.objects.filter(pub_date__gte=since).values_list(
+        'id', 'author_id', 'group_id', 'pub_date', 'views_count'
+    ).order_by())
+    own = defaultdict(list)
+    for pk, _, _, pub_date, views_count in posts:
+        own[pk] += [point('post', pub_date),
+                    _spread('view', views_count, pub_date, now)]
+    comments = Comment.objects.filter(post__pub_date__gte=since)
+    for post_id, created in comments.values_list('post_id', 'created'):
+        own[post_id].append(point('comment', created))
+    follows = defaultdict(list)
+    for author_id, created in Follow.objects.filter(
+        created__gte=since
+    ).values_list('author_id', 'created'):
+        follows[author_id].append(created)
+    post_scores, group_points = {}, defaultdict(list)
+    for pk, author_id, group_id, pub_date, _ in posts:
+        followed = [point('follow', created)
+                    for created in follows[author_id] if created >= pub_date]
+        post_scores[pk] = log_sum(own[pk] + followed)
+        if group_id:
+            group_points[group_id] += own[pk]
+    Post.objects.bulk_update(
+        [Post(id=pk, trending_score=score)
+         for pk, score in post_scores.items()],
+        ['trending_score'], batch_size=BATCH_SIZE,
+    )
+    Group.objects.bulk_update(
+        [Group(id=pk, trending_score=log_sum(points))
+         for pk, points in group_points.items()],
+        ['trending_score'], batch_size=BATCH_SIZE,
+    )
+    Group.objects.exclude(posts__pub_date__gte=since).update(
+        trending_score=0.0
+    )
+    return len(posts)
+
+
+def trending_posts(limit: int):
+    """Популярные посты — чтение индекса ``post_trending_idx``."""
+    return Post.objects.cards().order_by('-trending_score', '-id')[:limit]
+
+
+def trending_groups(limit: int):
+    return Group.objects.order_by('-trending_score', '-id')[:limit]
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'posts'
 
@@ -8,11 +8,15 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('posts/<int:post_id>/comments/', views.post_comments,
+         name='post_comments'),
     path('posts/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
     path('posts/<int:post_id>/delete/', views.post_delete, name='post_delete'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('create/', views.post_create, name='post_create'),
+    path('search/', views.post_search, name='search'),
+    path('trending/', views.trending_posts, name='trending'),
 
     path('follow/', views.follow_index, name='follow_index'),
     path(
@@ -25,4 +29,12 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+
+    path('api/posts/', api.posts_list, name='api_posts'),
+    path('api/posts/<int:post_id>/', api.post_detail,
+         name='api_post_detail'),
+    path('api/groups/<slug:slug>/', api.group_detail, name='api_group'),
+    path('api/profiles/<str:username>/', api.profile_detail,
+         name='api_profile'),
+    path('api/follow/', api.follow_list, name='api_follow'),
 ]
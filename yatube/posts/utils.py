@@ -1,12 +1,228 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional
+
 from django.conf import settings
-from django.core.paginator import Paginator
+from django.core.paginator import EmptyPage, InvalidPage, Page, Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
 from .models import Post
 
 
-def page_pagik(request, list_objects: list[Post]):
+class CursorPaginator(Paginator):
+    """
+    Паджинатор по ключу (дата, id) в порядке убывания или возрастания,
+    как в ``order_by`` QuerySet'а.
+
+    Номерные страницы (``?page=N``) читаются через OFFSET, причем
+    вторая половина ленты — с конца, в обратном порядке. Соседние
+    страницы открываются по непрозрачному курсору (``?cursor=...``):
+    их стоимость не зависит от глубины листания. Но и страница по
+    курсору знает свой номер, а ``has_next`` и ``num_pages`` — длину
+    списка: без ``count`` ее дает COUNT(*).
+
+    ``estimated=True`` — ``count`` лишь оценка (например, устаревшее
+    число из кеша или денормализованный счетчик): страницы тогда
+    читаются только с начала, с одной лишней строкой, и по ней число
+    уточняется вблизи текущей страницы. Заниженная оценка не прячет
+    строки: номер за ее концом тоже читается.
+    """
+
+    def __init__(self, object_list, per_page, count=None, estimated=False,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        ordering = (object_list.query.order_by
+                    or object_list.model._meta.ordering)
+        self.keys = [field.lstrip('-') for field in ordering]
+        self.descending = ordering[0].startswith('-')
+        if (len(self.keys) != 2 or self.descending
+                != ordering[1].startswith('-')):
+            raise ValueError(
+                'Нужен порядок по двум полям в одну сторону, '
+                f'например (дата, id), а не {list(ordering)}'
+            )
+        self._count = count
+        self.estimated = estimated
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.estimated or int(number) < 1:
+                raise
+            return int(number)
+
+    @cached_property
+    def count(self):
+        if self._count is not None:
+            return self._count()
+        return super().count
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        if self.estimated:
+            object_list = list(
+                self.object_list[bottom:bottom + self.per_page + 1]
+            )
+            if not object_list and number > 1:
+                self._set_count(self.object_list.count())
+                raise EmptyPage('Страница за концом списка')
+            return self._cursor_page(self._correct(object_list, number),
+                                     number)
+        top = min(bottom + self.per_page, self.count)
+        if number * 2 <= self.num_pages + 1:
+            object_list = list(self.object_list[bottom:top])
+        else:
+            tail = self.object_list.reverse()
+            object_list = list(tail[self.count - top:self.count - bottom])
+            object_list.reverse()
+        return self._cursor_page(object_list, number)
+
+    def get_page(self, number):
+        try:
+            return super().get_page(number)
+        except EmptyPage:
+            # Оценка длины была завышена; ``page`` уже ее уточнил.
+            return self.page(self.num_pages)
+
+    def cursor_page(self, cursor: str):
+        """Страница, соседняя с той, на которой выдан курсор."""
+        forward, number, date, pk = self.decode_cursor(cursor)
+        if forward:
+            query = self._after(date, pk, self.descending)
+            object_list = list(
+                self.object_list.filter(query)[:self.per_page + 1]
+            )
+            number += 1
+            if self.estimated:
+                object_list = self._correct(object_list, number)
+            object_list = object_list[:self.per_page]
+        else:
+            query = self._after(date, pk, not self.descending)
+            object_list = list(
+                self.object_list.filter(query).reverse()[:self.per_page]
+            )
+            object_list.reverse()
+            number -= 1
+        if not object_list or number < 1:
+            raise InvalidPage('Страница по курсору пуста')
+        return self._cursor_page(object_list, number)
+
+    def _correct(self, object_list: list, number: int) -> list:
+        """
+        Сверяет длину с прочитанными строками (лишняя строка — признак
+        следующей страницы) и отрезает лишнее.
+        """
+        bottom = (number - 1) * self.per_page
+        if len(object_list) > self.per_page:
+            self._set_count(max(self.count, bottom + len(object_list)))
+        elif object_list or number == 1:
+            self._set_count(bottom + len(object_list))
+        return object_list[:self.per_page]
+
+    def _set_count(self, count: int):
+        self.count = count
+        for name in ('num_pages', 'page_range'):
+            self.__dict__.pop(name, None)
+
+    def _after(self, date, pk, descending: bool) -> Q:
+        """Строки, идущие за ключом (``date``, ``pk``) в этом порядке."""
+        date_key, pk_key = self.keys
+        lookup = 'lt' if descending else 'gt'
+        return (Q(**{f'{date_key}__{lookup}': date})
+                | Q(**{date_key: date, f'{pk_key}__{lookup}': pk}))
+
+    def _cursor_page(self, object_list, number):
+        page = Page(object_list, number, self)
+        page.next_cursor = page.previous_cursor = None
+        if object_list and page.has_next():
+            page.next_cursor = self.encode_cursor(
+                True, number, object_list[-1])
+        if object_list and page.has_previous():
+            page.previous_cursor = self.encode_cursor(
+                False, number, object_list[0])
+        return page
+
+    def encode_cursor(self, forward: bool, number: int, obj) -> str:
+        date_key, pk_key = self.keys
+        raw = '{}:{}:{}:{}'.format(
+            'n' if forward else 'p',
+            number,
+            getattr(obj, date_key).isoformat(),
+            getattr(obj, pk_key),
+        )
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str):
+        try:
+            raw = base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4)
+            ).decode()
+            direction, number, rest = raw.split(':', 2)
+            date, pk = rest.rsplit(':', 1)
+            return (direction == 'n', int(number),
+                    datetime.fromisoformat(date), int(pk))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise InvalidPage('Некорректный курсор')
+
+
+def page_pagik(request, list_objects: list[Post], count=None,
+               per_page: Optional[int] = None, estimated=False):
     """
     Паджик (паджинатор), который вернет страницу.
+
+    ``count`` — функция, возвращающая длину списка, если ее можно
+    получить дешевле, чем COUNT(*) по ``list_objects``; ``estimated`` —
+    если она возвращает лишь оценку. Битый или устаревший курсор дает
+    404, а не молча первую страницу.
+    """
+    paginator = CursorPaginator(list_objects,
+                                per_page or settings.COUNT_POSTS,
+                                count=count, estimated=estimated)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            return paginator.cursor_page(cursor)
+        except InvalidPage as error:
+            raise Http404(str(error))
+    return paginator.get_page(request.GET.get('page'))
+
+
+def comments_pagik(request, post: Post):
+    """
+    Комментарии поста по ``settings.COUNT_COMMENTS``: от старых к новым,
+    следующие — по курсору. Общее число берется из ``comments_count``
+    как оценка: разошедшийся счетчик не прячет комментарии.
+    """
+    return page_pagik(
+        request,
+        post.comments.select_related('author'),
+        count=lambda: post.comments_count,
+        per_page=settings.COUNT_COMMENTS,
+        estimated=True,
+    )
+
+
+def page_window(number: int, num_pages: int,
+                on_each_side: Optional[int] = None) -> list:
+    """
+    Номера страниц для навигации: первая, последняя и ``on_each_side``
+    по обе стороны от текущей; ``None`` — пропуск.
     """
-    paginator = Paginator(list_objects, settings.COUNT_POSTS)
-    page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+    if on_each_side is None:
+        on_each_side = settings.PAGINATOR_WINDOW
+    pages = sorted({1, num_pages, *range(max(number - on_each_side, 1),
+                                         min(number + on_each_side,
+                                             num_pages) + 1)})
+    window = []
+    for page in pages:
+        if window and page - window[-1] == 2:
+            window.append(page - 1)
+        elif window and page - window[-1] > 2:
+            window.append(None)
+        window.append(page)
+    return window
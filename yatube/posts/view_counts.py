@@ -0,0 +1,188 @@
+import logging
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from typing import Optional
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from . import trending
+from .models import Group, Post
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE: int = 250
+"""Строк в одном UPDATE: по три параметра на строку, SQLite берет 999."""
+
+
+class ViewBuffer:
+    """
+    Просмотры постов, накопленные в памяти процесса, — по паре (пост,
+    зритель); ``None`` — аноним.
+
+    ``add`` только увеличивает счетчик под блокировкой; в базу просмотры
+    попадают через ``flush`` — по одному UPDATE на пачку постов и на
+    пачку их групп, сколько бы просмотров ни набралось. Просмотры,
+    не сброшенные до остановки процесса, теряются — не больше, чем
+    за ``VIEW_COUNTS_FLUSH_INTERVAL`` секунд.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = Counter()
+        self.flushed_at = time.monotonic()
+        self.flusher = None
+
+    def add(self, post_id: int, viewer_id: Optional[int]):
+        with self.lock:
+            self.views[post_id, viewer_id] += 1
+
+    def due(self) -> bool:
+        """Пора сбрасывать: прошел интервал или накопилось много пар."""
+        if not self.views:
+            return False
+        return (len(self.views) >= settings.VIEW_COUNTS_MAX_PENDING
+                or time.monotonic() - self.flushed_at
+                >= settings.VIEW_COUNTS_FLUSH_INTERVAL)
+
+    def take(self) -> Counter:
+        with self.lock:
+            views, self.views = self.views, Counter()
+            self.flushed_at = time.monotonic()
+        return views
+
+    def restore(self, views: Counter):
+        """Возвращает несброшенные просмотры, чтобы не потерять их."""
+        with self.lock:
+            self.views.update(views)
+
+
+buffer = ViewBuffer()
+
+
+def record(post_id: int, viewer_id: Optional[int]):
+    """Засчитывает просмотр поста; в базу он попадет при сбросе."""
+    buffer.add(post_id, viewer_id)
+
+
+def counted(view):
+    """
+    Засчитывает просмотр страницы поста, в том числе ответ 304:
+    ставится над ``condition``, который иначе не вызовет вид.
+    """
+    @wraps(view)
+    def wrapper(request, post_id, *args, **kwargs):
+        response = view(request, post_id, *args, **kwargs)
+        if response.status_code in (200, 304):
+            record(post_id, request.user.pk)
+        return response
+    return wrapper
+
+
+def _increment(queryset, deltas: dict):
+    """``views_count += delta`` для каждой строки одним CASE."""
+    ids = list(deltas)
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start:start + BATCH_SIZE]
+        delta = Case(
+            *[When(id=pk, then=Value(deltas[pk])) for pk in batch],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        queryset.filter(id__in=batch).update(
+            views_count=F('views_count') + delta
+        )
+
+
+def _totals(views: Counter) -> tuple[Counter, Counter]:
+    """
+    Просмотры по постам и группам; группа и автор читаются при сбросе,
+    по запросу на пачку. Просмотры автора и удаленных постов пропускаются.
+    """
+    post_ids = list({post_id for post_id, _ in views})
+    rows = {}
+    for start in range(0, len(post_ids), BATCH_SIZE):
+        rows.update(
+            (pk, (author_id, group_id))
+            for pk, author_id, group_id in Post.objects.filter(
+                id__in=post_ids[start:start + BATCH_SIZE]
+            ).values_list('id', 'author_id', 'group_id').order_by()
+        )
+    post_views, group_views = Counter(), Counter()
+    for (post_id, viewer_id), count in views.items():
+        if post_id not in rows or rows[post_id][0] == viewer_id:
+            continue
+        post_views[post_id] += count
+        group_id = rows[post_id][1]
+        if group_id:
+            group_views[group_id] += count
+    return post_views, group_views
+
+
+def flush() -> int:
+    """
+    Записывает накопленные просмотры в базу. Версии страниц не
+    сдвигаются: счетчики на страницах обновляются с окном
+    ``etags.views_window``. Если база недоступна, просмотры остаются
+    в буфере до следующего сброса.
+
+    Возвращает число постов, у которых изменился счетчик.
+    """
+    views = buffer.take()
+    if not views:
+        return 0
+    try:
+        with transaction.atomic():
+            post_views, group_views = _totals(views)
+            _increment(Post.objects, post_views)
+            _increment(Group.objects, group_views)
+            trending.posts_viewed(post_views, group_views)
+    except DatabaseError:
+        logger.exception('Просмотры не записаны, повтор при следующем сбросе')
+        buffer.restore(views)
+        return 0
+    return len(post_views)
+
+
+def flush_if_due():
+    """Сброс по таймеру; вызывается по окончании запроса и из ``Flusher``."""
+    if buffer.due():
+        flush()
+
+
+class Flusher(threading.Thread):
+    """
+    Фоновый сброс раз в ``VIEW_COUNTS_FLUSH_INTERVAL`` секунд: без него
+    процесс, к которому перестали приходить запросы, держал бы
+    просмотры в памяти до следующего запроса.
+    """
+
+    def __init__(self):
+        super().__init__(name='view-counts', daemon=True)
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(settings.VIEW_COUNTS_FLUSH_INTERVAL):
+            try:
+                flush_if_due()
+            except Exception:
+                logger.exception('Сброс просмотров не удался')
+            finally:
+                connection.close()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def start_flusher():
+    """
+    Запускает ``Flusher`` в процессе веб-сервера (wsgi.py и asgi.py);
+    повторный вызов ничего не делает. Тесты и команды manage.py поток
+    не запускают: там просмотры сбрасываются явно.
+    """
+    with buffer.lock:
+        if buffer.flusher is None or not buffer.flusher.is_alive():
+            buffer.flusher = Flusher()
+            buffer.flusher.start()
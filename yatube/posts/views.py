@@ -1,51 +1,60 @@
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.views.decorators.http import condition
+from django.utils.http import urlencode
 from django.shortcuts import render, get_object_or_404, redirect
+from core.db_router import use_primary
 from users.decorators import user_valid_edit_post
-from .utils import page_pagik
-from .models import Post, Group, User, Follow
+from . import etags, page_cache, search, thumbnails, trending, view_counts
+from .feed import follow_feed, follow_feed_count
+from .utils import comments_pagik, page_pagik
+from .models import Post, Group, User, Follow, UserStats
 from .forms import PostForm, CommentForm
 
 
+@condition(etag_func=etags.index)
+@page_cache.anonymous_page(etags.index)
 def index(request):
     template = 'posts/index.html'
     title = 'Это главная страница проекта Yatube'
-    name_cache = 'main_post_list'
-    post_list = cache.get(name_cache)
-    if not post_list:
-        post_list = (
-            Post.objects.select_related().all()
-        )
-        cache.set(name_cache, post_list, settings.TIME_CACHE)
-    page_obj = page_pagik(request, post_list)
+    post_list = Post.objects.cards()
+    page_obj = page_cache.feed_page(
+        request, page_cache.main_feed(), post_list,
+        count=lambda: page_cache.feed_count(page_cache.main_feed(),
+                                            Post.objects.count),
+        estimated=True,
+    )
     context = {
         'title': title,
         'page_obj': page_obj,
-        'count_words': settings.COUNT_WORDS_POST,
     }
     return render(request, template, context)
 
 
+@condition(etag_func=etags.group_posts)
+@page_cache.anonymous_page(etags.group_posts)
 def group_posts(request, slug):
-    group = get_object_or_404(Group.objects.select_related(), slug=slug)
+    group = get_object_or_404(Group, slug=slug)
     template = 'posts/group_list.html'
     title = 'Здесь будет информация о группах проекта Yatube'
-    name_cache = f'gr[{slug}]_post_list'
-    post_list = cache.get(name_cache)
-    if not post_list:
-        post_list = group.posts.select_related('author').all()
-        cache.set(name_cache, post_list, settings.TIME_CACHE)
-    page_obj = page_pagik(request, post_list)
+    post_list = group.posts.cards()
+    page_obj = page_cache.feed_page(
+        request, page_cache.group_feed(group.id), post_list,
+        count=lambda: group.posts_count,
+        estimated=True,
+    )
     context = {
         'title': title,
         'group': group,
         'page_obj': page_obj,
-        'count_words': settings.COUNT_WORDS_POST,
     }
     return render(request, template, context)
 
 
+@condition(etag_func=etags.profile)
+@page_cache.anonymous_page(etags.profile)
 def profile(request, username):
     template = 'posts/profile.html'
     author = get_object_or_404(User, username=username)
@@ -56,38 +65,93 @@ def profile(request, username):
             author=author,
             user=user
         ).exists()
-    name_cache = f'pf[{username}]_post_list'
-    post_list = cache.get(name_cache)
-    if not post_list:
-        post_list = author.posts.select_related().all()
-        cache.set(name_cache, post_list, settings.TIME_CACHE)
-    page_obj = page_pagik(request, post_list)
+    stats = UserStats.of(author)
+    post_list = author.posts.cards()
+    page_obj = page_cache.feed_page(
+        request, page_cache.profile_feed(author.id), post_list,
+        count=lambda: stats.posts_count,
+        estimated=True,
+    )
     context = {
         'author': author,
-        'count_posts': post_list.count,
+        'stats': stats,
+        'count_posts': stats.posts_count,
         'page_obj': page_obj,
-        'count_words': settings.COUNT_WORDS_POST,
         'following': following,
     }
     return render(request, template, context)
 
 
+@view_counts.counted
+@condition(etag_func=etags.post_detail)
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post.objects.select_related(), id=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), id=post_id
+    )
     is_read = (post.author == request.user)
-    comments_list = post.comments.select_related('author').all()
+    comments_page = comments_pagik(request, post)
     context = {
         'post': post,
-        'count_chars': settings.COUNT_CHAR_POST_TITLE,
         'is_read': is_read,
+        'author_stats': UserStats.of(post.author_id),
         'form_comment': CommentForm(),
-        'comments_list': comments_list,
+        'comments_page': comments_page,
+        'comments_list': comments_page.object_list,
+    }
+    return render(request, template, context)
+
+
+@condition(etag_func=etags.post_detail)
+def post_comments(request, post_id):
+    """
+    Следующие комментарии поста — фрагмент, который скрипт страницы
+    поста подставляет вместо ссылки «Следующие комментарии».
+    """
+    post = get_object_or_404(
+        Post.objects.only('id', 'comments_count'), id=post_id
+    )
+    context = {
+        'post': post,
+        'comments_page': comments_pagik(request, post),
+        'fragment': True,
+    }
+    return render(request, 'posts/includes/comments.html', context)
+
+
+def trending_posts(request):
+    context = {
+        'title': 'Популярное',
+        'posts': trending.trending_posts(settings.COUNT_POSTS),
+        'groups': trending.trending_groups(settings.TRENDING_GROUPS),
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+def post_search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    paginator = Paginator(search.search(query), settings.COUNT_POSTS)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    posts = Post.objects.cards().in_bulk(
+        page_obj.object_list
+    )
+    page_obj.object_list = [
+        posts[post_id] for post_id in page_obj.object_list
+        if post_id in posts
+    ]
+    context = {
+        'title': 'Поиск по постам',
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&' if query else '',
     }
     return render(request, template, context)
 
 
+@use_primary
 @login_required
+@transaction.atomic
 def post_create(request):
     template = 'posts/create_post.html'
     context = {
@@ -100,16 +164,20 @@ def post_create(request):
         form = form.save(commit=False)
         form.author = request.user
         form.save()
+        if form.image:
+            thumbnails.schedule(form)
         return redirect('posts:profile', username=request.user.username)
     context['form'] = form
     return render(request, template, context)
 
 
+@use_primary
 @user_valid_edit_post
 @login_required
+@transaction.atomic
 def post_edit(request, post_id):
     template = 'posts/create_post.html'
-    instance = get_object_or_404(Post.objects.select_related(), id=post_id)
+    instance = get_object_or_404(Post, id=post_id)
     context = {
         'title': 'Редактировать пост',
         'button_name': 'Сохранить',
@@ -120,22 +188,27 @@ def post_edit(request, post_id):
         instance=instance
     )
     if form.is_valid():
-
-        form.save()
-
+        post = form.save()
+        if 'image' in form.changed_data:
+            thumbnails.schedule(post)
         return redirect('posts:post_detail', post_id)
     context['form'] = form
     return render(request, template, context)
 
 
+@use_primary
 @user_valid_edit_post
 @login_required
+@transaction.atomic
 def post_delete(request, post_id):
-    Post.objects.filter(id=post_id).delete()
+    post = get_object_or_404(Post, id=post_id)
+    post.delete()
     return redirect('posts:main')
 
 
+@use_primary
 @login_required
+@transaction.atomic
 def add_comment(request, post_id):
     post = Post.objects.get(id=post_id)
     form = CommentForm(request.POST or None)
@@ -149,17 +222,26 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
-    page_obj = page_pagik(request, post_list)
+    post_list = follow_feed(request.user)
+    page_obj = page_pagik(
+        request,
+        post_list,
+        count=lambda: page_cache.feed_count(
+            page_cache.subscriptions_feed(request.user.id),
+            lambda: follow_feed_count(request.user, post_list),
+        ),
+        estimated=True,
+    )
     context = {
         'title': 'Избранные авторы',
         'page_obj': page_obj,
-        'count_words': settings.COUNT_WORDS_POST,
     }
     return render(request, 'posts/follow.html', context)
 
 
+@use_primary
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     author = User.objects.get(username=username)
     if author != request.user:
@@ -170,7 +252,9 @@ def profile_follow(request, username):
     return redirect('posts:profile', username)
 
 
+@use_primary
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     author = User.objects.get(username=username)
     if Follow.objects.filter(author=author, user=request.user).exists():
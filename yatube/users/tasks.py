@@ -0,0 +1,14 @@
+from typing import Optional
+
+from django.core.mail import EmailMultiAlternatives
+from jobs.queue import task
+
+
+@task(priority=10, max_attempts=5)
+def send_email(subject: str, body: str, from_email: Optional[str],
+               to: list[str], html_body: Optional[str] = None):
+    """Отправляет письмо вне запроса (сброс пароля и т. п.)."""
+    message = EmailMultiAlternatives(subject, body, from_email, to)
+    if html_body:
+        message.attach_alternative(html_body, 'text/html')
+    message.send()
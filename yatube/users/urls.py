@@ -1,6 +1,7 @@
 from django.contrib.auth import views as dj_views
 from django.urls import path
 from . import views
+from .forms import QueuedPasswordResetForm
 
 app_name = 'users'
 
@@ -37,7 +38,8 @@ urlpatterns = [
     path(
         'password_reset/',
         dj_views.PasswordResetView.as_view(
-            template_name='users/password_reset_form.html'
+            template_name='users/password_reset_form.html',
+            form_class=QueuedPasswordResetForm,
         ),
         name='password_reset_form'
     ),
@@ -0,0 +1,21 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Django 2.2 has no native ASGI support, so the WSGI handler runs in a bounded
+thread pool behind ``core.asgi.WsgiToAsgi``.
+"""
+
+import os
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+from core.asgi import WsgiToAsgi
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+application = WsgiToAsgi(get_wsgi_application(), settings.ASGI_THREADS)
+
+from posts import view_counts  # noqa: E402
+
+view_counts.start_flusher()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+from urllib.parse import urlsplit
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'about.apps.AboutConfig',
     'core.apps.CoreConfig',
+    'jobs.apps.JobsConfig',
     'posts.apps.PostsConfig',
     'users.apps.UsersConfig',
     'sorl.thumbnail',
@@ -55,6 +57,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.db_router.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -86,6 +90,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+ASGI_THREADS: int = int(os.environ.get('YATUBE_ASGI_THREADS', 8))
+"""Потоки ASGI-процесса, в которых выполняются виды (и запросы к БД)."""
+
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
@@ -97,6 +104,24 @@ DATABASES = {
     }
 }
 
+DATABASE_REPLICAS: list[str] = []
+"""Псевдонимы реплик для чтения (YATUBE_DB_REPLICAS — пути к файлам через запятую)."""
+for number, path in enumerate(
+    filter(None, os.environ.get('YATUBE_DB_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+REPLICA_APPS: list[str] = ['posts', 'auth']
+"""Приложения, чьи модели в запросах читаются с реплик."""
+REPLICA_PIN_SECONDS: int = 5
+"""Сколько секунд после записи пользователь читает основную базу."""
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -144,14 +169,80 @@ STATICFILES_DIRS = [
 
 COUNT_POSTS: int = 10
 """Количество выводимых постов."""
+COUNT_COMMENTS: int = 20
+"""Количество комментариев на странице поста."""
 COUNT_WORDS_POST: int = 30
 """Количество выводимых слов поста."""
 COUNT_CHAR_POST_TITLE: int = 30
 """Количество выводимых символов поста в названии."""
 COUNT_CHAR_POST_STR: int = 15
 """Количество выводимых символов поста в __str__."""
-TIME_CACHE: int = 30
-"""Время кеширования данных."""
+TIME_CACHE: int = 60 * 10
+"""Время кеширования страниц лент (сбрасываются и явно, по версии)."""
+FEED_COUNT_CACHE: int = 60 * 10
+"""Время кеширования длины больших лент (между пересчетами она — оценка)."""
+PAGINATOR_WINDOW: int = 2
+"""Сколько номеров страниц показывать по обе стороны от текущей."""
+CACHE_STALE_TTL: int = 60 * 5
+"""Сколько секунд после истечения страница еще отдается, пока ее пересчитывают."""
+CARD_CACHE: int = 60 * 60 * 24
+"""Время кеширования карточек постов (ключ меняется вместе с содержимым)."""
+JOBS_EAGER: bool = DEBUG
+"""Выполнять задачи очереди после коммита, без исполнителя: под runserver его нет."""
+JOBS_CONCURRENCY: int = 2
+"""Размер пула исполнителя очереди (manage.py run_jobs)."""
+JOBS_POLL_INTERVAL: float = 1.0
+"""Пауза исполнителя между проверками пустой очереди, секунды."""
+JOBS_RETRY_DELAY: int = 10
+"""Пауза перед первым повтором упавшей задачи; дальше она удваивается."""
+JOBS_LEASE: int = 60 * 10
+"""Через сколько секунд взятая и не законченная задача возвращается в очередь."""
+VIEW_COUNTS_FLUSH_INTERVAL: int = 10
+"""Как часто процесс записывает накопленные просмотры постов в базу, секунды."""
+VIEW_COUNTS_MAX_PENDING: int = 1000
+"""Сколько постов с просмотрами копить до внеочередной записи."""
+TRENDING_HALF_LIFE: int = 60 * 60 * 12
+"""Через сколько секунд вклад события в популярность уменьшается вдвое."""
+TRENDING_WINDOW: int = 60 * 60 * 24 * 7
+"""За сколько секунд пересчитываются оценки постов (manage.py recompute_trending)."""
+TRENDING_WEIGHTS: dict = {
+    'post': 1.0,
+    'view': 0.1,
+    'comment': 2.0,
+    'follow': 3.0,
+}
+"""Вес события в популярности: публикация, просмотр, комментарий, подписка."""
+TRENDING_GROUPS: int = 5
+"""Количество групп в блоке популярных групп."""
+SEARCH_BACKEND: str = 'auto'
+"""Поиск: 'auto' — FTS5, если есть в SQLite, иначе 'python' (свой индекс)."""
+SEARCH_MAX_RESULTS: int = 1000
+"""Наибольшее число найденных постов."""
+FEED_FANOUT_LIMIT: int = 1000
+"""Число подписчиков, с которого посты автора читаются при открытии ленты."""
+FEED_BACKFILL: int = 500
+"""Сколько последних постов автора добавлять в ленту при подписке."""
+FEED_BATCH_SIZE: int = 300
+"""Размер пачки при массовой записи в ленты подписчиков: по три параметра на строку, SQLite берет не больше 999."""
+METRICS_SAMPLE_RATE: float = 0.1
+"""Доля запросов, для которых собираются метрики (1 — все)."""
+API_PAGE_MAX: int = 100
+"""Наибольший размер страницы JSON API (?limit=)."""
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yatube.metrics': {
+            'handlers': ['console'],
+            'level': 'WARNING' if DEBUG else 'INFO',
+            'propagate': False,
+        },
+    },
+}
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:main'
@@ -165,8 +256,49 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
+CACHE_URL = os.environ.get('YATUBE_CACHE_URL', 'locmem://')
+"""
+Общий кеш процессов: redis://[:пароль@]хост:порт/база, file:///путь,
+db://таблица (нужен createcachetable) или locmem:// (только один процесс).
+"""
+CACHE_LOCAL_ENTRIES = int(os.environ.get('YATUBE_CACHE_LOCAL_ENTRIES', 1000))
+"""Размер локального LRU каждого процесса (0 — не держать ключи локально)."""
+
+
+def shared_cache(url: str) -> dict:
+    parts = urlsplit(url)
+    if parts.scheme == 'redis':
+        return {
+            'BACKEND': 'core.cache_backends.RespCache',
+            'LOCATION': f'{parts.hostname}:{parts.port or 6379}',
+            'OPTIONS': {
+                'DB': int(parts.path.strip('/') or 0),
+                'PASSWORD': parts.password,
+            },
+        }
+    if parts.scheme == 'file':
+        return {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': parts.path,
+        }
+    if parts.scheme == 'db':
+        return {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': parts.netloc,
+        }
+    return {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.cache_backends.TieredCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'MAX_ENTRIES': CACHE_LOCAL_ENTRIES,
+            'LOCAL_PREFIXES': (
+                ['post_card:'] if CACHE_LOCAL_ENTRIES else []
+            ),
+        },
+    },
+    'shared': shared_cache(CACHE_URL),
 }
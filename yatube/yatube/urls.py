@@ -17,6 +17,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
+from core.views import metrics_view
 
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
@@ -24,6 +25,7 @@ urlpatterns = [
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
     path('admin/', admin.site.urls),
+    path('metrics/', metrics_view, name='metrics'),
 ]
 
 handler403 = 'core.views.forbidden'
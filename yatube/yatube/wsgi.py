@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+from posts import view_counts  # noqa: E402
+
+view_counts.start_flusher()